@@ -36,15 +36,33 @@ Logger.info("App initialized", category="app")
 def sessionAndCameraCleanup():
     from lib.class_session import Session
     from lib.class_camera import Camera
+    from lib.class_process_registry import ProcessRegistry
+    from lib.class_write_stager import WriteStager
+    from lib.class_time_index import TimeIndex
+    ProcessRegistry.recover()
+    WriteStager.recover()
+    for name in ProcessRegistry.list():
+        if name.startswith("capture") and ProcessRegistry.terminate(name):
+            Logger.warning(f"Stopped capture pipeline '{name}' left over from previous run", category="camera")
     active = [s for s in Session.list_all() if s.get("status") == "active"]
     if active:
         Logger.warning(f"{len(active)} session(s) still marked active on startup", category="session")
     Session.clean_invalid_sessions()
+    Session.recover_counters()
     Session.end_orphaned_sessions()
+    TimeIndex.load()
     Camera.remove_temp_images()
 
 sessionAndCameraCleanup()
 
+# --- Probe camera resolutions in the background ---
+from lib.class_resolution_cache import ResolutionCache
+ResolutionCache.start()
+
+# --- Start the thermal/load throttle governor ---
+from lib.class_governor import ThrottleGovernor
+ThrottleGovernor.start()
+
 # --- Initialize TempZip Singleton ---
 TempZip.get_instance()
 
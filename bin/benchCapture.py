@@ -0,0 +1,227 @@
+import os
+import sys
+import time
+import json
+import threading
+import argparse
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lib.class_config import Config
+
+
+class NullSocketIO:
+    def emit(self, event, data):
+        pass
+
+
+def setup_sandbox(root: Path, args):
+    """Point config, sessions and logs at a throwaway directory before anything else loads."""
+    Config._config_path = root / "config"
+    Config._config_file = Config._config_path / "config.json"
+    Config.load()
+    Config.set({
+        "camera_type": "synthetic",
+        "synthetic_motion": args.motion,
+        "synthetic_latency_ms": args.latency,
+        "storage_path": str(root / "sessions"),
+        "download_path": str(root / "downloads"),
+        "log_path": str(root / "logs"),
+        "latest_symlink": str(root / "latest.jpg"),
+        "log_level": "WARNING",
+        "metrics_enabled": True,
+        "change_detection_enabled": not args.no_detect
+    })
+    Config.get("storage_path").mkdir(parents=True, exist_ok=True)
+
+
+def synthetic_stream_backend():
+    """
+    VideoStreamBackend fed by a thread that writes synthetic JPEGs into a
+    pipe at the configured fps, so high-rate cases go through the same
+    MjpegFrameReader splitting and handoff as libcamera-vid/ffmpeg output.
+    """
+    from lib.class_camera_backend import CameraBackend, VideoStreamBackend, SyntheticBackend
+    from lib.class_frame_source import MjpegFrameReader
+
+    class SyntheticStreamBackend(VideoStreamBackend):
+        name = "synthetic-mjpeg"
+
+        def open(self):
+            with self._lock:
+                if self._reader:
+                    return
+                rfd, wfd = os.pipe()
+                self._source = SyntheticBackend(self.setting)
+                self._source.open()
+                self._stop = threading.Event()
+                self._pipe = os.fdopen(rfd, "rb", buffering=0)
+                self._writer = threading.Thread(target=self._produce, args=(os.fdopen(wfd, "wb", buffering=0),), daemon=True)
+                self._reader = MjpegFrameReader(self._pipe, name="bench-mjpeg")
+                self._reader.start()
+                self._writer.start()
+                self._seq = 0
+                self._open = True
+
+        def _produce(self, out):
+            resolution = self.setting("resolution")
+            deadline = time.monotonic()
+            with out:
+                while not self._stop.is_set():
+                    try:
+                        out.write(self._source.capture_bytes(resolution))
+                    except OSError:
+                        break
+                    deadline += 1 / self.fps
+                    self._stop.wait(max(0.0, deadline - time.monotonic()))
+
+        def close(self):
+            with self._lock:
+                if not self._reader:
+                    return
+                self._stop.set()
+                self._writer.join(timeout=5)
+                self._reader.stop()
+                self._pipe.close()
+                self.frames_streamed = self._reader.frames_read
+                self._reader = None
+                self._open = False
+
+    create = CameraBackend.create
+
+    def create_streaming(camera_type=None, high_rate=False, setting=None, process_name="capture"):
+        if high_rate:
+            return SyntheticStreamBackend("synthetic", (setting or Config.get)("high_rate_fps"), setting, process_name)
+        return create(camera_type, high_rate, setting, process_name)
+
+    CameraBackend.create = staticmethod(create_streaming)
+
+
+def dir_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def run_case(interval, resolution, duration, single_exposure, counters, fps=None, staging=False):
+    from lib.class_camera import Camera
+    from lib.class_session import Session
+    from lib.class_metrics import Metrics
+
+    Config.set({
+        "interval": interval,
+        "resolution": resolution,
+        "single_exposure_enabled": single_exposure,
+        "high_rate_enabled": fps is not None,
+        "high_rate_fps": fps or 5,
+        "staging_enabled": staging
+    })
+    Metrics.reset()
+    counters.update(saves=0, bytes=0)
+
+    camera = Camera.get_instance()
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    camera.start()
+    time.sleep(duration)
+    backend = camera.backend
+    camera.stop()
+    camera.capture_thread.join(timeout=30)
+    wall = time.monotonic() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    session = Session.get_latest_session()
+    frames = session.get("file_count", 0)
+    written = dir_bytes(Config.get("storage_path") / session.session_id())
+    stages = Metrics.summary()
+    jitter = camera.get_schedule_stats()["jitter_ms"]
+
+    return {
+        "interval": round(1 / fps, 3) if fps else interval,
+        "resolution": resolution,
+        "single_exposure": single_exposure,
+        "staging": staging,
+        "frames": frames,
+        "fps": round(frames / wall, 3),
+        "cpu_ms_per_frame": round(cpu / frames * 1000, 1) if frames else None,
+        "bytes_written": written,
+        "session_writes": counters["saves"],
+        "session_bytes": counters["bytes"],
+        "write_p50_ms": stages.get("file_write", {}).get("p50_ms"),
+        "write_p99_ms": stages.get("file_write", {}).get("p99_ms"),
+        "jitter_p99_ms": jitter["p99"],
+        # Frames the MJPEG reader split out of the stream (high-rate only)
+        "stream_frames": getattr(backend, "frames_streamed", None),
+        "stages": stages
+    }
+
+
+def track_session_writes(counters):
+    from lib.class_session_store import SessionStore
+    original = SessionStore._execute.__func__
+
+    def counting_execute(cls, sql, params=()):
+        if not sql.startswith("SELECT"):
+            counters["saves"] += 1
+            counters["bytes"] += sum(len(p) for p in params if isinstance(p, str))
+        return original(cls, sql, params)
+
+    SessionStore._execute = classmethod(counting_execute)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive the capture loop with the synthetic camera and report throughput")
+    parser.add_argument("-i", "--intervals", nargs="+", type=float, default=[1, 2], help="Capture intervals in seconds")
+    parser.add_argument("-r", "--resolutions", nargs="+", default=["640x480", "1600x1200"], help="Capture resolutions")
+    parser.add_argument("-d", "--duration", type=float, default=10, help="Seconds to run each case")
+    parser.add_argument("--motion", type=int, default=96, help="Synthetic motion in pixels per frame")
+    parser.add_argument("--fps", nargs="+", type=int,
+                        help="Run high-rate mode at these frame rates instead of the interval matrix, "
+                             "with synthetic frames streamed through the MJPEG reader")
+    parser.add_argument("--no-detect", action="store_true", help="Disable change detection (capture every tick)")
+    parser.add_argument("--latency", type=int, default=50, help="Synthetic capture latency in ms")
+    parser.add_argument("--staging", action="store_true", help="Run every case with direct writes and with RAM staging")
+    parser.add_argument("--staging-path", default="/dev/shm", help="tmpfs directory for the staging area")
+    parser.add_argument("--fsync", default="batch", help="Staging fsync policy (always, batch, never)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="timelapse-bench-") as tmp, \
+            tempfile.TemporaryDirectory(prefix="timelapse-stage-", dir=args.staging_path) as stage:
+        setup_sandbox(Path(tmp), args)
+        Config.set({"staging_path": stage, "staging_fsync": args.fsync})
+        staging_modes = (False, True) if args.staging else (False,)
+
+        from lib.class_socket import SocketManager
+        SocketManager.set_socketio(NullSocketIO())
+
+        counters = {"saves": 0, "bytes": 0}
+        track_session_writes(counters)
+
+        results = []
+        if args.fps:
+            synthetic_stream_backend()
+            for res in args.resolutions:
+                for fps in args.fps:
+                    for staging in staging_modes:
+                        print(f"[INFO] high-rate fps={fps} resolution={res} staging={staging}", file=sys.stderr)
+                        results.append(run_case(1 / fps, res, args.duration, True, counters, fps=fps, staging=staging))
+        else:
+            for single in (False, True):
+                for res in args.resolutions:
+                    for interval in args.intervals:
+                        for staging in staging_modes:
+                            print(f"[INFO] interval={interval}s resolution={res} single_exposure={single} staging={staging}", file=sys.stderr)
+                            results.append(run_case(interval, res, args.duration, single, counters, staging=staging))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'interval':>8} {'resolution':>10} {'single':>6} {'staged':>6} {'frames':>6} {'fps':>6} {'cpu ms/f':>8} {'bytes':>10} "
+              f"{'sess writes':>11} {'sess bytes':>10} {'write p50':>9} {'write p99':>9} {'jitter p99':>10} {'streamed':>8}")
+        for r in results:
+            print(f"{r['interval']:>8} {r['resolution']:>10} {str(r['single_exposure']):>6} {str(r['staging']):>6} {r['frames']:>6} {r['fps']:>6} "
+                  f"{str(r['cpu_ms_per_frame']):>8} {r['bytes_written']:>10} {r['session_writes']:>11} {r['session_bytes']:>10} "
+                  f"{str(r['write_p50_ms']):>9} {str(r['write_p99_ms']):>9} {str(r['jitter_p99_ms']):>10} {str(r['stream_frames']):>8}")
@@ -0,0 +1,54 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from PIL import Image, ImageChops
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.class_change_detect import ChangeDetector
+
+
+def legacy_rms(im1, im2) -> float:
+    # The per-pixel loop previously used by Camera._compare_images
+    diff = ImageChops.difference(im1, im2)
+    return (sum(p**2 for p in diff.getdata()) / (im1.size[0] * im1.size[1])) ** 0.5
+
+
+def make_frames(resolution: str):
+    width, height = map(int, resolution.lower().split("x"))
+    base = Image.effect_noise((width, height), 40)
+    moved = base.copy()
+    moved.paste(255, (width // 4, height // 4, width // 2, height // 2))
+    return base.convert("L"), moved.convert("L")
+
+
+def time_it(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark change detection across preview resolutions")
+    parser.add_argument("resolutions", nargs="*", default=["160x120", "320x240", "640x480", "1280x960"], help="Preview resolutions to test")
+    parser.add_argument("-n", "--runs", type=int, default=20, help="Comparisons per resolution")
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the per-pixel Python loop")
+
+    args = parser.parse_args()
+    print(f"[INFO] Engine: {ChangeDetector.engine()}")
+    print(f"{'resolution':>12} {'engine ms':>10} {'legacy ms':>10} {'speedup':>8}")
+
+    for res in args.resolutions:
+        base, moved = make_frames(res)
+        detector = ChangeDetector()
+        detector.set_baseline(base)
+
+        engine_ms = time_it(lambda: detector.compare(moved), args.runs)
+        if args.skip_legacy:
+            print(f"{res:>12} {engine_ms:>10.2f} {'-':>10} {'-':>8}")
+            continue
+
+        legacy_ms = time_it(lambda: legacy_rms(moved, base), max(1, args.runs // 4))
+        print(f"{res:>12} {engine_ms:>10.2f} {legacy_ms:>10.2f} {legacy_ms / engine_ms:>7.1f}x")
@@ -0,0 +1,80 @@
+import sys
+import time
+import tempfile
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.class_rolling_window import RollingWindow
+
+
+FRAME = b"\xff\xd8" + b"\x00" * 60 + b"\xff\xd9"
+
+
+def write_frame(folder: Path, index: int) -> Path:
+    path = folder / f"{index:010d}.jpg"
+    path.write_bytes(FRAME)
+    return path
+
+
+def rescan_evict(folder: Path, window: int):
+    # What a directory-based implementation does per frame: list, sort,
+    # delete the overflow and re-total the folder
+    files = sorted(folder.glob("*.jpg"))
+    for path in files[:max(0, len(files) - window)]:
+        path.unlink()
+    return sum(f.stat().st_size for f in files[-window:])
+
+
+def pct(samples: list, p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+
+def run(window: int, frames: int, rescan_frames: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="rolling-bench-") as tmp:
+        folder = Path(tmp)
+        rolling = RollingWindow(max_frames=window)
+
+        # Fill the window; timestamps are synthetic so only the frame cap applies
+        for i in range(window):
+            rolling.add(write_frame(folder, i), len(FRAME), captured_at=i)
+
+        samples = []
+        for i in range(window, window + frames):
+            path = write_frame(folder, i)
+            start = time.perf_counter()
+            rolling.add(path, len(FRAME), captured_at=i)
+            samples.append((time.perf_counter() - start) * 1e6)
+
+        assert len(rolling) == window and rolling.size == window * len(FRAME)
+
+        rescan = []
+        for i in range(window + frames, window + frames + rescan_frames):
+            write_frame(folder, i)
+            start = time.perf_counter()
+            rescan_evict(folder, window)
+            rescan.append((time.perf_counter() - start) * 1e6)
+
+    return {
+        "window": window,
+        "p50": pct(samples, 50),
+        "p99": pct(samples, 99),
+        "max": max(samples),
+        "rescan_p50": pct(rescan, 50) if rescan else None
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark steady-state rolling window eviction")
+    parser.add_argument("windows", nargs="*", type=int, default=[1000, 10000, 100000], help="Window sizes in frames")
+    parser.add_argument("-n", "--frames", type=int, default=5000, help="Steady-state frames to time per window")
+    parser.add_argument("--rescan", type=int, default=5, help="Frames to time with a directory rescan (0 to skip)")
+
+    args = parser.parse_args()
+    print(f"{'window':>8} {'p50 us':>8} {'p99 us':>8} {'max us':>9} {'rescan us':>11}")
+
+    for window in args.windows:
+        r = run(window, args.frames, args.rescan)
+        rescan = f"{r['rescan_p50']:>11.0f}" if r["rescan_p50"] is not None else f"{'-':>11}"
+        print(f"{r['window']:>8} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['max']:>9.1f} {rescan}")
@@ -0,0 +1,132 @@
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.class_config import Config
+from lib.class_session_store import SessionStore
+
+
+def make_session(index: int) -> dict:
+    started = datetime(2024, 1, 1) + timedelta(hours=index)
+    return {
+        "session_id": started.strftime("%Y%m%d-%H%M") + f"-{index}",
+        "camera": "default",
+        "status": "idle",
+        "started_at": started.isoformat(),
+        "ended_at": (started + timedelta(hours=1)).isoformat(),
+        "interval": 10,
+        "resolution": "1920x1080",
+        "file_count": 360,
+        "size_bytes": 360 * 450000,
+        "rolling_window": {"hours": 0, "frames": 0, "evicted": 0},
+        "schedule_history": [],
+        "exposure": None,
+        "exposure_locks": [],
+        "bursts": [],
+        "tags": ["bench"],
+        "notes": "",
+        "zip_file": None,
+        "zip_size": None
+    }
+
+
+def written_bytes() -> int:
+    # wchar counts bytes passed to write(), page cache or not
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def pct(samples: list, p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+
+def timed(frames: int, step) -> dict:
+    samples = []
+    before = written_bytes()
+    for i in range(frames):
+        start = time.perf_counter()
+        step(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return {
+        "p50": pct(samples, 50),
+        "p99": pct(samples, 99),
+        "bytes": (written_bytes() - before) // frames
+    }
+
+
+def bench_json(root: Path, sessions: list, frames: int) -> dict:
+    # The previous implementation: rewrite the whole list on every frame
+    path = root / "sessions.json"
+    active = sessions[-1]
+
+    def step(i):
+        active["file_count"] = i
+        active["size_bytes"] = i * 450000
+        with open(path, "w") as f:
+            json.dump(sessions, f, indent=2)
+
+    return timed(frames, step)
+
+
+def bench_sqlite(sessions: list, frames: int) -> dict:
+    for s in sessions:
+        SessionStore.insert(s)
+    session_id = sessions[-1]["session_id"]
+
+    def step(i):
+        SessionStore.update(session_id, {
+            "file_count": i,
+            "size_bytes": i * 450000,
+            "rolling_window": {"hours": 0, "frames": 0, "evicted": 0}
+        })
+
+    return timed(frames, step)
+
+
+def run(count: int, frames: int) -> dict:
+    sessions = [make_session(i) for i in range(count)]
+    sessions[-1]["status"] = "active"
+
+    with tempfile.TemporaryDirectory(prefix="session-bench-") as tmp:
+        root = Path(tmp)
+        # Keep the legacy file out of the config dir so it is not migrated
+        Config._config_path = root / "config"
+        Config._config_file = Config._config_path / "config.json"
+        legacy = bench_json(root, sessions, frames)
+        store = bench_sqlite(sessions, frames)
+
+        start = time.perf_counter()
+        for _ in range(100):
+            SessionStore.first(status="active")
+        lookup = (time.perf_counter() - start) * 1e4
+        SessionStore.close()
+
+    return {"sessions": count, "json": legacy, "sqlite": store, "active_lookup_us": lookup}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-frame session write cost: sessions.json rewrite vs SQLite")
+    parser.add_argument("counts", nargs="*", type=int, default=[10, 1000, 10000], help="Number of stored sessions")
+    parser.add_argument("-n", "--frames", type=int, default=200, help="Frames to time per case")
+
+    args = parser.parse_args()
+    print(f"{'sessions':>8} {'json p50':>9} {'json p99':>9} {'json B/f':>10} "
+          f"{'sql p50':>8} {'sql p99':>8} {'sql B/f':>8} {'active us':>9}")
+
+    for count in args.counts:
+        r = run(count, args.frames)
+        j, s = r["json"], r["sqlite"]
+        print(f"{count:>8} {j['p50']:>9.0f} {j['p99']:>9.0f} {j['bytes']:>10} "
+              f"{s['p50']:>8.0f} {s['p99']:>8.0f} {s['bytes']:>8} {r['active_lookup_us']:>9.1f}")
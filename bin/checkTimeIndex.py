@@ -0,0 +1,133 @@
+import sys
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lib.class_config import Config
+
+
+FRAME = b"\xff\xd8" + b"\x00" * 60 + b"\xff\xd9"
+
+
+def setup_sandbox(root: Path):
+    """Point config and sessions at a throwaway directory before anything else loads."""
+    Config._config_path = root / "config"
+    Config._config_file = Config._config_path / "config.json"
+    Config.load()
+    Config.set({
+        "storage_path": str(root / "sessions"),
+        "download_path": str(root / "downloads"),
+        "log_path": str(root / "logs"),
+        "log_level": "WARNING"
+    })
+    Config.get("storage_path").mkdir(parents=True, exist_ok=True)
+
+
+def build_sessions(count: int, frames: int, rng: random.Random) -> dict:
+    """Sessions with overlapping frame spans and a burst each, plus one without a capture folder."""
+    from lib.class_camera import Camera
+    from lib.class_frame_manifest import FrameManifest
+    from lib.class_session_store import SessionStore
+
+    storage = Config.get("storage_path")
+    base = datetime(2026, 1, 1)
+    expected = {"frames": [], "bursts": []}
+
+    for i in range(count):
+        sid = f"session-{i:03d}"
+        folder = storage / sid
+        folder.mkdir()
+        start = base + timedelta(minutes=rng.randint(0, 600))
+        listed = []
+        for n in range(frames):
+            ts = start + timedelta(seconds=n * 30, milliseconds=i)
+            path = folder / Camera.frame_name(ts)
+            path.write_bytes(FRAME)
+            listed.append((path, len(FRAME), ts, None))
+            expected["frames"].append((ts, path))
+        FrameManifest(folder).append(listed)
+
+        burst_at = start + timedelta(seconds=frames * 15, milliseconds=i)
+        burst = folder / f"burst-{Path(Camera.frame_name(burst_at)).stem}"
+        burst.mkdir()
+        for n in range(5):
+            ts = burst_at + timedelta(seconds=n * 0.5)
+            path = burst / Camera.frame_name(ts)
+            path.write_bytes(FRAME)
+            expected["bursts"].append((ts, path))
+
+        SessionStore.insert({
+            "session_id": sid,
+            "camera": "default",
+            "status": "idle",
+            "started_at": start.isoformat(),
+            "ended_at": listed[-1][2].isoformat(),
+            "bursts": [{"folder": burst.name, "started_at": burst_at.isoformat(), "ended_at": ts.isoformat(),
+                        "frames": 5, "bytes": 5 * len(FRAME)}]
+        })
+
+    # Recorded but never captured into: must read as empty, not break the index
+    SessionStore.insert({"session_id": "session-missing", "camera": "default", "status": "idle",
+                         "started_at": base.isoformat()})
+    return expected
+
+
+def check(windows: int, page: int, rng: random.Random, expected: dict) -> int:
+    from lib.class_frame_manifest import FrameManifest
+    from lib.class_session import Session
+    from lib.class_time_index import TimeIndex
+    from lib.class_zip import ZipTask
+
+    failures = 0
+    missing = FrameManifest(Config.get("storage_path") / "session-missing")
+    if missing.entries() or missing.between("", "~") or missing.first() or missing.total_bytes():
+        print("missing folder: manifest not empty")
+        failures += 1
+    Session.total_size()
+
+    times = sorted(ts for ts, _ in expected["frames"])
+    for _ in range(windows):
+        a, b = sorted(rng.sample(times, 2))
+        want = sorted(p.relative_to(Config.get("storage_path")).as_posix()
+                      for ts, p in expected["frames"] if a <= ts <= b)
+
+        got, offset = [], 0
+        while offset is not None:
+            result = TimeIndex.frames(a, b, offset, page)
+            got += [f"{f['session_id']}/{f['filename']}" for f in result["frames"]]
+            offset = result["next_offset"]
+        if sorted(got) != want or len(got) != result["total"]:
+            print(f"{a} .. {b}: index has {len(got)} frame(s), walk has {len(want)}")
+            failures += 1
+
+        want_bursts = sorted(p for ts, p in expected["bursts"] if a <= ts <= b)
+        got_bursts = sorted(ZipTask._burst_frames(a, b))
+        if got_bursts != want_bursts:
+            print(f"{a} .. {b}: {len(got_bursts)} burst frame(s), walk has {len(want_bursts)}")
+            failures += 1
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check TimeIndex range queries and range-zip burst frames against a brute-force walk")
+    parser.add_argument("-s", "--sessions", type=int, default=20, help="Sessions to create")
+    parser.add_argument("-n", "--frames", type=int, default=100, help="Frames per session")
+    parser.add_argument("-w", "--windows", type=int, default=50, help="Random windows to query")
+    parser.add_argument("--page", type=int, default=7, help="Page size for the paginated query")
+    parser.add_argument("--seed", type=int, default=1)
+
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="time-index-check-") as tmp:
+        setup_sandbox(Path(tmp))
+        expected = build_sessions(args.sessions, args.frames, rng)
+        failures = check(args.windows, args.page, rng, expected)
+
+    print(f"{args.windows} window(s) checked, {failures} failure(s)")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,65 @@
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.class_config import Config
+from lib.class_camera import Camera
+from lib.class_frame_manifest import FrameManifest
+from lib.class_session_store import SessionStore
+
+
+def repair(session: dict, check: bool) -> bool:
+    """Compare a session's manifest with its folder; rewrite it unless check-only. Returns True if it differed."""
+    folder = Config.get("storage_path") / session["session_id"]
+    if not folder.is_dir():
+        print(f"{session['session_id']}: no capture folder, skipped")
+        return False
+
+    manifest = FrameManifest(folder)
+    listed = {e[1]: e[2] for e in manifest.entries()} if manifest.path.exists() else None
+    on_disk = {}
+    for frame in folder.glob("*.jpg"):
+        if Camera.timestamp_from_name(frame.name, warn=False):
+            on_disk[frame.name] = frame.stat().st_size
+
+    if listed == on_disk:
+        print(f"{session['session_id']}: ok ({len(on_disk)} frames)")
+        return False
+
+    if listed is None:
+        detail = "manifest missing"
+    else:
+        missing = len(on_disk.keys() - listed.keys())
+        stale = len(listed.keys() - on_disk.keys())
+        resized = sum(1 for k in listed.keys() & on_disk.keys() if listed[k] != on_disk[k])
+        detail = f"{missing} unlisted, {stale} stale, {resized} resized"
+
+    if check:
+        print(f"{session['session_id']}: differs ({detail})")
+    else:
+        count = manifest.rebuild()
+        print(f"{session['session_id']}: rebuilt ({detail}; {count} frames)")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check or rebuild per-session frame manifests from the capture folders")
+    parser.add_argument("sessions", nargs="*", help="Session IDs (default: all sessions)")
+    parser.add_argument("--check", action="store_true", help="Only report differences, do not rewrite")
+    parser.add_argument("--force", action="store_true", help="Also rebuild sessions that are still marked active")
+
+    args = parser.parse_args()
+    sessions = [SessionStore.get(sid) for sid in args.sessions] if args.sessions else SessionStore.all()
+
+    differed = 0
+    for sid, session in zip(args.sessions or [s["session_id"] for s in sessions], sessions):
+        if session is None:
+            print(f"{sid}: unknown session")
+            continue
+        if session.get("status") == "active" and not args.force and not args.check:
+            print(f"{sid}: still capturing, skipped (use --force if the app is not running)")
+            continue
+        differed += repair(session, args.check)
+
+    sys.exit(1 if args.check and differed else 0)
@@ -1,82 +1,205 @@
-import os
+import io
 import time
-import shutil
 import subprocess
 import threading
 from datetime import datetime
 from pathlib import Path
-from PIL import Image, ImageChops
-import psutil
-import re
+from PIL import Image
 
 from lib.class_session import Session
+from lib.class_camera_backend import CameraBackend, StreamTapBackend
+from lib.class_change_detect import ChangeDetector
+from lib.class_scheduler import CaptureScheduler
+from lib.class_post_process import PostProcessor
+from lib.class_metrics import Metrics
+from lib.class_frame_buffer import FrameRingBuffer
+from lib.class_governor import ThrottleGovernor
+from lib.class_write_stager import WriteStager
+from lib.class_resolution_cache import ResolutionCache
+from lib.class_process_registry import ProcessRegistry
 from lib.class_config import Config
 from lib.class_logging import Logger
-from lib.class_socket import SocketManager
 
 
 
 
 class Camera:
-    _instance = None
+    """
+    One instance per named camera. "default" is configured by the top-level
+    camera settings and owns the live streamer; additional cameras are
+    declared in the "cameras" config as name -> overrides of OVERRIDES.
+    Each instance has its own capture loop, session and change detection.
+    Cameras that share a bus take turns capturing via a per-bus lock.
+    """
+    DEFAULT = "default"
+    OVERRIDES = (
+        "camera_type", "video_device", "camera_num", "bus", "resolution",
+        "preview_resolution", "interval", "high_rate_fps", "exposure_lock_enabled",
+        "exposure_lock_refresh_minutes", "synthetic_motion", "synthetic_latency_ms"
+    )
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+    _bus_locks = {}
     _preview_path = Path("/tmp/preview.jpg")
-    _compare_path = Path("/tmp/prev_compare.jpg")
 
     def __init__(self):
-        raise RuntimeError("Use get_instance() to access the Camera singleton")
+        raise RuntimeError("Use get_instance() to access a Camera")
 
     @classmethod
-    def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = object.__new__(cls)
-            cls._instance._init_internal()
-        return cls._instance
+    def get_instance(cls, name: str = None):
+        name = name or cls.DEFAULT
+        with cls._instances_lock:
+            if name not in cls._instances:
+                if name not in cls.names():
+                    raise ValueError(f"Unknown camera '{name}'")
+                instance = object.__new__(cls)
+                instance._init_internal(name)
+                cls._instances[name] = instance
+            return cls._instances[name]
 
-    def _init_internal(self):
+    @classmethod
+    def names(cls) -> list:
+        return [cls.DEFAULT] + [n for n in Config.get("cameras") if n != cls.DEFAULT]
+
+    @classmethod
+    def all(cls) -> list:
+        return [cls.get_instance(name) for name in cls.names()]
+
+    def _init_internal(self, name: str):
+        self.name = name
+        if name != self.DEFAULT:
+            self._preview_path = self._preview_path.with_name(f"preview-{name}.jpg")
         self.session = None
         self.capture_thread = None
         self.running = False
-        self._stream_proc = None
+        self.backend = None
+        self._detector = ChangeDetector()
+        self.last_change = None
+        self._scheduler = None
+        self._post = None
+        self._tap = False
+        self._tap_stalled_since = None
+        self._burst = None
+        self._ring = FrameRingBuffer(0, 0)
         self._lock = threading.Lock()
 
+    def __repr__(self):
+        return f"<Camera {self.name} ({self.get_mode()})>"
+
+    def setting(self, key, fallback=None):
+        """Config value for this camera: its override if it has one, else the global setting."""
+        if self.name != self.DEFAULT:
+            overrides = Config.get("cameras").get(self.name, {})
+            if key in overrides:
+                return overrides[key]
+        return Config.get(key, fallback)
+
+    def bus(self) -> str:
+        """Captures are serialised per bus; by default each device is its own bus."""
+        camera_type = self.setting("camera_type")
+        if camera_type == "synthetic":
+            default = f"synthetic:{self.name}"
+        elif camera_type.startswith("libcamera"):
+            default = f"csi:{self.setting('camera_num', 0)}"
+        else:
+            default = self.setting("video_device", "/dev/video0")
+        return self.setting("bus") or default
+
+    def _bus_lock(self) -> threading.Lock:
+        with Camera._instances_lock:
+            return Camera._bus_locks.setdefault(self.bus(), threading.Lock())
+
+    def _on_bus(self, fn, *args):
+        """Run a capture call while holding this camera's bus."""
+        lock = self._bus_lock()
+        with Metrics.timer("bus_wait"):
+            lock.acquire()
+        try:
+            return fn(*args)
+        finally:
+            lock.release()
+
+    def _bus_offset(self, interval: float) -> float:
+        """Spread the tick phase of cameras sharing a bus across the interval."""
+        bus = self.bus()
+        peers = [name for name in self.names() if Camera.get_instance(name).bus() == bus]
+        return peers.index(self.name) * interval / len(peers)
+
+    def get_latest_path(self) -> Path:
+        latest = WriteStager.latest_path()
+        return latest if self.name == self.DEFAULT else latest.with_name(f"latest-{self.name}.jpg")
+
+    def get_status(self) -> dict:
+        return {
+            "name": self.name,
+            "mode": self.get_mode(),
+            "camera_type": self.setting("camera_type"),
+            "bus": self.bus(),
+            "session_id": self.session.session_id() if self.session else None,
+            "stream_tap": self.is_tapping(),
+            "change": self.get_change_heatmap(),
+            "schedule": self.get_schedule_stats(),
+            "postprocess": self.get_postprocess_stats(),
+            "burst": self.get_burst_stats(),
+            "rolling": self.get_rolling_stats()
+        }
+
     @staticmethod
     def _using_libcamera() -> bool:
-        return Config.get("camera_type", "usb") == "libcamera"
+        return Config.get("camera_type", "usb").startswith("libcamera")
 
     def is_running(self) -> bool:
         return self.running
 
+    def is_tapping(self) -> bool:
+        return self.running and self._tap
+
     @staticmethod
     def is_streaming() -> bool:
-        for proc in psutil.process_iter(["cmdline"]):
-            cmd = " ".join(proc.info["cmdline"] or [])
-            if "mjpg_streamer" in cmd:
-                return True
-            if "libcamera-vid" in cmd and "streamer_relay.py" in cmd:
-                return True
-        return False
+        return ProcessRegistry.is_alive("streamer")
 
     def get_mode(self) -> str:
         if self.is_running():
             return "capture"
-        if self.is_streaming():
+        if self.name == self.DEFAULT and self.is_streaming():
             return "streaming"
         return "idle"
 
     def get_stream_url(self) -> str:
-        if self._using_libcamera:
+        if self._using_libcamera():
             return f"http://localhost:8080/"
         else:
             return f"http://localhost:8080/?action=stream"
 
+    def capture_interval(self) -> float:
+        """Seconds between captures: 1/fps in high-rate mode, else this camera's interval."""
+        if Config.get("high_rate_enabled"):
+            return 1 / max(1, self.setting("high_rate_fps"))
+        return float(self.setting("interval"))
+
+    def can_start_capture(self) -> bool:
+        if self.is_running():
+            return False
+        if self.name != self.DEFAULT:
+            return True
+        return not self.is_streaming() or Config.get("stream_tap_enabled")
+
     def start(self):
         with self._lock:
-            if self.is_running() or self.is_streaming():
+            if not self.can_start_capture():
                 Logger.warning("Cannot start capture — another mode is active", category="camera")
                 return
 
-            self.session = Session()
-            self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._tap = self.name == self.DEFAULT and self.is_streaming()
+            self._tap_stalled_since = None
+
+            self.session = Session(
+                camera=self.name,
+                interval=self.capture_interval(),
+                resolution=self.setting("resolution")
+            )
+            self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True, name=f"capture-{self.name}")
             self.capture_thread.start()
             from lib.class_status import Status
             Status.force_emit()
@@ -84,6 +207,8 @@ class Camera:
     def stop(self):
         with self._lock:
             self.running = False
+            if self._scheduler:
+                self._scheduler.wake()
 
 
     def start_streamer(self):
@@ -96,13 +221,13 @@ class Camera:
             try:
                 if self._using_libcamera():
                     width, height = resolution.split("x")
-                    self._stream_proc = subprocess.Popen([
+                    ProcessRegistry.spawn("streamer", [
                         "bash", "-c",
                         f"libcamera-vid --codec mjpeg -t 0 --inline --framerate 15 --width {width} --height {height} -o - "
                         f"| python3 lib/streamer_relay.py"
                     ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 else:
-                    self._stream_proc = subprocess.Popen([
+                    ProcessRegistry.spawn("streamer", [
                         "mjpg_streamer",
                         "-i", f"input_uvc.so -r {resolution} -f 15",
                         "-o", "output_http.so -w ./www -p 8080"
@@ -118,24 +243,17 @@ class Camera:
 
     def stop_streamer(self):
         with self._lock:
-            if self._stream_proc:
-                try:
-                    self._stream_proc.terminate()
-                    self._stream_proc.wait(timeout=3)
-                    Logger.info("Streamer stopped (via tracked process)", category="camera")
-                except Exception as e:
-                    Logger.warning(f"Failed to terminate streamer cleanly: {e}", category="camera")
-                finally:
-                    self._stream_proc = None
-
-            # Fallback: kill by name depending on backend
-            if self._using_libcamera():
-                subprocess.call(["pkill", "-f", "libcamera-vid"])
-                subprocess.call(["pkill", "-f", "streamer_relay.py"])
-                Logger.debug("Streamer not tracked — used pkill fallback (libcamera)", category="camera")
+            if ProcessRegistry.terminate("streamer"):
+                Logger.info("Streamer stopped (via tracked process)", category="camera")
             else:
-                subprocess.call(["pkill", "-f", "mjpg_streamer"])
-                Logger.debug("Streamer not tracked — used pkill fallback (mjpg_streamer)", category="camera")
+                # Fallback: kill by name depending on backend
+                if self._using_libcamera():
+                    subprocess.call(["pkill", "-f", "libcamera-vid"])
+                    subprocess.call(["pkill", "-f", "streamer_relay.py"])
+                    Logger.debug("Streamer not tracked — used pkill fallback (libcamera)", category="camera")
+                else:
+                    subprocess.call(["pkill", "-f", "mjpg_streamer"])
+                    Logger.debug("Streamer not tracked — used pkill fallback (mjpg_streamer)", category="camera")
 
             from lib.class_status import Status
             Status.force_emit()
@@ -147,162 +265,397 @@ class Camera:
 
 
 
-    def _compare_images(self) -> float:
+    def _compare_images(self, preview) -> dict:
         try:
-            with Image.open(self._preview_path).convert("L") as im1, Image.open(self._compare_path).convert("L") as im2:
-                if im1.size != im2.size:
-                    im2 = im2.resize(im1.size)
-                diff = ImageChops.difference(im1, im2)
-                rms = (sum(p**2 for p in diff.getdata()) / (im1.size[0] * im1.size[1])) ** 0.5
-                return rms
+            result = self._detector.compare(preview)
+            Logger.debug(f"Change MAD: {result['mad']:.2f}, blocks changed: {len(result['changed'])}", category="camera")
+            self.last_change = self._detector.heatmap(result)
+            return result
         except Exception as e:
             Logger.error(f"Image comparison error: {e}", category="camera")
-            return float("inf")
+            return None
+
+    def get_change_heatmap(self) -> dict:
+        return self.last_change
+
+    @staticmethod
+    def _preview_from_frame(frame: bytes, preview_res: str):
+        """
+        Build a greyscale change-detection preview from an in-memory JPEG.
+        draft() lets the JPEG decoder downscale during decode, so the full
+        frame is never decoded at full resolution.
+        """
+        try:
+            size = CameraBackend._parse_resolution(preview_res, (320, 240))
+            img = Image.open(io.BytesIO(frame))
+            img.draft("L", size)
+            img = img.convert("L")
+            if img.size != size:
+                img = img.resize(size)
+            return img
+        except Exception as e:
+            Logger.error(f"Failed to decode preview from frame: {e}", category="camera")
+            return None
 
     def _get_output_path(self) -> Path:
         session_id = self.session.session_id()
         folder = Config.get("storage_path") / session_id
         folder.mkdir(parents=True, exist_ok=True)
-        filename = datetime.now().strftime("%Y%m%d-%H%M%S.jpg")
-        return folder / filename
+        return folder / self.frame_name(datetime.now())
 
     def _capture_loop(self):
-        interval     = Config.get("interval")
-        resolution   = Config.get("resolution")
-        preview_res  = Config.get("preview_resolution")
+        high_rate    = Config.get("high_rate_enabled")
+        interval     = self.capture_interval()
+        resolution   = self.setting("resolution")
+        preview_res  = self.setting("preview_resolution")
         threshold    = Config.get("change_threshold")
         detect_change = Config.get("change_detection_enabled")
+        burst        = Config.get("burst_enabled") and detect_change
+        single_exposure = Config.get("single_exposure_enabled") or high_rate or self._tap or burst
+        adaptive     = Config.get("adaptive_interval_enabled") and detect_change
+        adaptive_factor = max(1.0, Config.get("adaptive_interval_factor"))
+        adaptive_max = max(interval, Config.get("adaptive_interval_max"))
         auto_stop    = Config.get("auto_stop_enabled")
         stop_minutes = int(Config.get("auto_stop_after_idle_minutes"))
-        latest_path  = Config.get("latest_symlink")
-
+        latest_path  = self.get_latest_path()
+        exposure_lock = self.setting("exposure_lock_enabled") and not self._tap
+        relock_every = float(self.setting("exposure_lock_refresh_minutes")) * 60
+        next_relock  = None
+
+        self._detector = ChangeDetector.from_config()
+        self.last_change = None
+        self._scheduler = CaptureScheduler(interval, Config.get("missed_tick_policy"))
+        ThrottleGovernor.reset_ticks(self.name)
+        self._post = PostProcessor(self.session, latest_path)
+        self._burst = None
+        self._ring = FrameRingBuffer(
+            Config.get("burst_pre_frames") if burst else 0,
+            Config.get("burst_memory_mb") * 1024 * 1024
+        )
         self.running = True
-        Logger.info(f"--- Starting capture session: {self.session.session_id()} ---", category="camera")
+        Logger.info(f"--- Starting capture session: {self.session.session_id()} ({self.name}) ---", category="camera")
 
         idle_start = None
+        throttle_level = None
+        staging = False
         
         try:
+            self._open_backend(high_rate)
+            if exposure_lock and self._lock_exposure("start") and relock_every > 0:
+                next_relock = time.monotonic() + relock_every
+            WriteStager.start()
+            staging = True
+            self._post.start()
+            self._scheduler.start(self._bus_offset(interval))
             while self.running:
-                loop_start = time.time()
-                if not self._capture_image(self._preview_path, preview_res):
-                    Logger.warning("Preview capture failed.", category="camera")
-                    self._log_and_sleep(loop_start, interval)
-                    continue
+                loop_start = time.monotonic()
+                self._scheduler.begin_tick()
+                frame = preview = None
+
+                if next_relock and loop_start >= next_relock:
+                    self._lock_exposure("refresh")
+                    next_relock = loop_start + relock_every
+
+                throttle = ThrottleGovernor.policy()
+                if ThrottleGovernor.level() != throttle_level:
+                    throttle_level = ThrottleGovernor.level()
+                    preview_res = self._scale_resolution(self.setting("preview_resolution"), throttle["preview_scale"])
+                    if throttle["interval_factor"] != self._scheduler.stretch:
+                        self._scheduler.set_stretch(throttle["interval_factor"])
+                        reason = f"throttle:{ThrottleGovernor.LEVELS[throttle_level][0]}"
+                        self.session.record_interval(self._scheduler.period, reason)
+                    # The baseline was taken at the old preview size
+                    self._detector.reset()
+
+                if single_exposure:
+                    with Metrics.timer("full_capture"):
+                        frame = self._on_bus(self.backend.capture_bytes, resolution)
+                    captured_at = datetime.now()
+                    if frame and detect_change:
+                        with Metrics.timer("decode"):
+                            preview = self._preview_from_frame(frame, preview_res)
+                    if not frame or (detect_change and preview is None):
+                        Logger.warning("Frame capture failed.", category="camera")
+                        if self._tap and not self._check_tap(loop_start, high_rate):
+                            break
+                        self._log_and_sleep(loop_start)
+                        continue
+                    self._tap_stalled_since = None
+                elif detect_change:
+                    # Without change detection the preview would go unused
+                    with Metrics.timer("preview_capture"):
+                        captured = self._on_bus(self._capture_image, self._preview_path, preview_res)
+                    if captured:
+                        with Metrics.timer("decode"):
+                            preview = ChangeDetector.load(self._preview_path)
+                    if preview is None:
+                        Logger.warning("Preview capture failed.", category="camera")
+                        self._log_and_sleep(loop_start)
+                        continue
+
+                if self._burst:
+                    if time.monotonic() < self._burst["until"]:
+                        self._save_burst_frame(frame, captured_at)
+                        self._log_and_sleep(loop_start)
+                        continue
+                    self._end_burst()
+
                 if not detect_change:
-                    self._full_capture(resolution, latest_path)
-                    self._log_and_sleep(loop_start, interval)
+                    self._full_capture(resolution, latest_path, frame)
+                    self._log_and_sleep(loop_start)
                     continue
 
-                if not self._compare_path.exists():
-                    shutil.copy2(self._preview_path, self._compare_path)
+                if not self._detector.has_baseline():
+                    self._detector.set_baseline(preview)
                     Logger.debug("Initialized comparison baseline.", category="camera")
                     idle_start = None
-                    self._full_capture(resolution,latest_path)
-                    self._log_and_sleep(loop_start, interval)
+                    self._full_capture(resolution, latest_path, frame)
+                    self._log_and_sleep(loop_start)
                     continue
 
-                rms = self._compare_images()
-                Logger.debug(f"Change RMS: {rms:.2f} (Threshold: {threshold})", category="camera")
-
+                with Metrics.timer("compare"):
+                    result = self._compare_images(preview)
+                if result:
+                    Logger.debug(f"Change RMS: {result['rms']:.2f} (Threshold: {threshold})", category="camera")
 
-                if rms < threshold:
+                if result and not self._detector.triggered(result, threshold):
+                    if adaptive:
+                        self._adapt_interval(min(self._scheduler.interval * adaptive_factor, adaptive_max), "idle")
+                    if burst:
+                        self._ring.push(frame, captured_at)
                     if idle_start is None:
                         idle_start = time.time()
                     elif auto_stop and (time.time() - idle_start > stop_minutes * 60):
                         Logger.info("Auto-stop triggered by inactivity.", category="camera")
                         break
-                    self._log_and_sleep(loop_start, interval)
+                    self._log_and_sleep(loop_start)
                     continue
 
                 idle_start = None
-                os.replace(self._preview_path, self._compare_path)
-                self._full_capture(resolution, latest_path)
-                self._log_and_sleep(loop_start, interval)
+                if adaptive:
+                    self._adapt_interval(interval, "change")
+                self._detector.set_baseline(preview)
+                self._full_capture(resolution, latest_path, frame, result["rms"] if result else None)
+                if burst:
+                    self._start_burst(captured_at)
+                self._log_and_sleep(loop_start)
 
         except Exception as e:
             Logger.error(f"Unexpected error in capture loop: {e}", category="camera")
         finally:
             self.running = False
+            if self._burst:
+                self._end_burst()
+            self._ring.clear()
+            self._detector.reset()
+            self._close_backend()
+            self._post.stop()
+            if staging:
+                WriteStager.stop()
 
             if self.session:
                 self.session.end()
                 Logger.info(f"Session {self.session.session_id()} ended", category="camera")
                 self.session = None
 
-            Camera.remove_temp_images()
+            Camera.remove_temp_images(self.name)
 
             from lib.class_status import Status
             Status.force_emit()
 
 
-    def _full_capture(self, resolution, latest_path):
+    def _full_capture(self, resolution, latest_path, frame: bytes = None, score: float = None):
         full_path = self._get_output_path()
-        if self._capture_image(full_path, resolution):
+        size = None
+        if frame is not None:
+            with Metrics.timer("file_write"):
+                captured = self._write_frame(full_path, frame)
+            size = len(frame)
+        else:
+            target = WriteStager.reserve(full_path)
+            with Metrics.timer("full_capture"):
+                captured = self._on_bus(self._capture_image, target, resolution)
+            if captured:
+                WriteStager.commit(full_path, target)
+
+        if captured:
             Logger.info(f"Captured {full_path}", category="camera")
-            try:
-                shutil.copy2(full_path, latest_path)
-            except Exception as e:
-                Logger.warning(f"Failed to update latest symlink: {e}", category="camera")
-            data = { 
-                "filename": full_path.name,
-                "session_id": self.session.session_id()
-            }
-            SocketManager.emit('image-updated', data)
-            self.session.increment_file_count()
+            self._post.submit(full_path, size, score)
         else:
             Logger.error("Full capture failed.", category="camera")
 
+    @staticmethod
+    def _scale_resolution(resolution: str, scale: float) -> str:
+        if scale >= 1:
+            return resolution
+        width, height = CameraBackend._parse_resolution(resolution)
+        return f"{max(16, int(width * scale))}x{max(16, int(height * scale))}"
 
+    @staticmethod
+    def _write_frame(path: Path, frame: bytes) -> bool:
+        return WriteStager.write(path, frame)
 
-    def _log_and_sleep(self, start_time, interval):
-        duration = time.time() - start_time
-        sleep_time = interval - duration
+
+
+    def _log_and_sleep(self, start_time):
+        interval = self._scheduler.period
+        duration = time.monotonic() - start_time
+        Metrics.record("loop", duration)
+        ThrottleGovernor.record_tick(duration, interval, self.name)
         if duration > interval:
             Logger.warning(f"Capture Loop processing time {duration:.2f}s exceeded interval of {interval}s", category="camera")
         else:
             Logger.debug(f"Capture Loop processing time {duration:.2f}s", category="camera")
 
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        if self.running:
+            self._scheduler.wait_next()
+
+    # ------------------ Burst capture ------------------
+
+    def _start_burst(self, triggered_at: datetime):
+        """
+        Switch to the burst rate for burst_duration seconds, writing frames
+        into a burst sub-folder of the session, starting with the frames held
+        in the pre-trigger ring buffer.
+        """
+        folder = Config.get("storage_path") / self.session.session_id() / f"burst-{Path(self.frame_name(triggered_at)).stem}"
+        folder.mkdir(parents=True, exist_ok=True)
+
+        self._burst = {
+            "folder": folder,
+            "until": time.monotonic() + Config.get("burst_duration"),
+            "return_interval": self._scheduler.interval,
+            "started_at": triggered_at.isoformat(),
+            "pre_frames": 0,
+            "frames": 0,
+            "bytes": 0
+        }
+
+        for captured_at, frame in self._ring.drain():
+            if self._save_burst_frame(frame, captured_at):
+                self._burst["pre_frames"] += 1
+
+        self._scheduler.set_interval(Config.get("burst_interval"))
+        Logger.info(f"Burst started in {folder.name} ({self._burst['pre_frames']} pre-trigger frames)", category="camera")
+
+    def _save_burst_frame(self, frame: bytes, captured_at: datetime) -> bool:
+        path = self._burst["folder"] / self.frame_name(captured_at)
+        with Metrics.timer("file_write"):
+            saved = self._write_frame(path, frame)
+        if saved:
+            self._burst["frames"] += 1
+            self._burst["bytes"] += len(frame)
+        return saved
+
+    def _end_burst(self):
+        burst, self._burst = self._burst, None
+        self._scheduler.set_interval(burst["return_interval"])
+        self.session.add_burst({
+            "folder": burst["folder"].name,
+            "started_at": burst["started_at"],
+            "ended_at": datetime.now().isoformat(),
+            "interval": Config.get("burst_interval"),
+            "pre_frames": burst["pre_frames"],
+            "frames": burst["frames"],
+            "bytes": burst["bytes"]
+        })
+        Logger.info(f"Burst {burst['folder'].name} ended with {burst['frames']} frames", category="camera")
+
+    def _lock_exposure(self, reason: str) -> bool:
+        """Meter and lock exposure/focus on the open backend and record the values in the session."""
+        with Metrics.timer("exposure_lock"):
+            values = self._on_bus(self.backend.lock_exposure)
+        if not values:
+            Logger.warning(f"Camera '{self.name}' backend '{self.backend.name}' could not lock exposure", category="camera")
+            return False
+        Logger.info(
+            f"Exposure locked ({reason}): {values['exposure_time_us']}us, gain {values['analogue_gain']}, "
+            f"lens {values['lens_position']}", category="camera"
+        )
+        self.session.record_exposure(values, reason)
+        return True
+
+    def _adapt_interval(self, new_interval, reason: str):
+        """Change the tick interval and record it in the session schedule history."""
+        if new_interval == self._scheduler.interval:
+            return
+        Logger.info(f"Capture interval {self._scheduler.interval:g}s -> {new_interval:g}s ({reason})", category="camera")
+        self._scheduler.set_interval(new_interval)
+        # Recorded as the real cadence, including any throttle stretch
+        self.session.record_interval(self._scheduler.period, reason)
+
+    def get_postprocess_stats(self) -> dict:
+        return self._post.stats() if self._post else None
+
+    def get_schedule_stats(self) -> dict:
+        return self._scheduler.stats() if self._scheduler else None
+
+    def get_rolling_stats(self) -> dict:
+        window = self.session.window if self.session else None
+        return window.stats() if window is not None else None
+
+    def get_burst_stats(self) -> dict:
+        burst = self._burst
+        return {
+            "active": burst is not None,
+            "folder": burst["folder"].name if burst else None,
+            "frames": burst["frames"] if burst else 0,
+            "ring": self._ring.stats()
+        }
 
 
 
     def _capture_image(self, path: Path, resolution: str) -> bool:
-        if self._using_libcamera():
-            return self._capture_libcamera(path, resolution)
-        return self._capture_usb(path, resolution)
-
-
-    def _capture_usb(self, path: Path, resolution: str) -> bool:
-        cmd = [
-            "fswebcam",
-            "--no-banner",
-            "-d", Config.get("video_device", "/dev/video0"),
-            "-r", resolution,
-            str(path)
-        ]
-        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        return result.returncode == 0
-
-    def _capture_libcamera(self, path: Path, resolution: str) -> bool:
+        if self.backend and self.backend.is_open():
+            return self.backend.capture(path, resolution)
+
+        # No session running: use a one-shot backend
+        backend = CameraBackend.create(setting=self.setting)
+        backend.open()
         try:
-            width, height = resolution.split("x")
-        except Exception:
-            width, height = "1920", "1080"
+            return backend.capture(path, resolution)
+        finally:
+            backend.close()
 
-        cmd = [
-            "libcamera-still",
-            "--autofocus-mode", "auto",
-            "--autofocus-range", "normal",
-            "--lens-position", "0.0",
-            "--width", width,
-            "--height", height,
-            "--timeout", "3000",
-            "-o", str(path)
-        ]
+    def _open_backend(self, high_rate: bool = False):
+        if self._tap:
+            self.backend = StreamTapBackend(self.get_stream_url())
+        else:
+            process_name = "capture" if self.name == self.DEFAULT else f"capture-{self.name}"
+            self.backend = CameraBackend.create(high_rate=high_rate, setting=self.setting, process_name=process_name)
+        self.backend.open()
+        Logger.info(f"Camera '{self.name}' backend '{self.backend.name}' opened", category="camera")
 
-        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        return result.returncode == 0
+    def _check_tap(self, now: float, high_rate: bool = False) -> bool:
+        """
+        The tapped stream delivered no frame. If the streamer has gone the
+        sensor is free again, so capture carries on with the configured
+        backend; if it is still running but stays silent for
+        stream_tap_stall_seconds the session is stopped. Returns False to stop.
+        """
+        if not self.is_streaming():
+            Logger.warning("Live stream ended, switching capture to the configured backend", category="camera")
+            self._close_backend()
+            self._tap = False
+            self._tap_stalled_since = None
+            self._open_backend(high_rate)
+            return True
+
+        if self._tap_stalled_since is None:
+            self._tap_stalled_since = now
+        elif now - self._tap_stalled_since > Config.get("stream_tap_stall_seconds"):
+            Logger.error(
+                f"Live stream stalled for over {Config.get('stream_tap_stall_seconds'):.0f}s, stopping capture",
+                category="camera"
+            )
+            return False
+        return True
+
+    def _close_backend(self):
+        if self.backend:
+            self.backend.close()
+            Logger.debug(f"Camera backend '{self.backend.name}' closed", category="camera")
+            self.backend = None
 
 
 
@@ -323,97 +676,48 @@ class Camera:
 
     @staticmethod
     def get_supported_resolutions(aspect_ratio: str = None):
-        if Camera._using_libcamera():
-            return Camera.get_libcamera_resolutions(aspect_ratio)
-
-        try:
-            output = subprocess.check_output([
-                "v4l2-ctl", "--list-formats-ext",
-                "-d", Config.get("video_device", "/dev/video0")
-            ], text=True)
-
-            resolutions = {
-                line.split()[2]
-                for line in output.splitlines()
-                if line.strip().startswith("Size: Discrete")
-            }
-
-            result = []
-            for r in resolutions:
-                ratio = Camera._aspect_ratio(r)
-                if aspect_ratio and ratio.lower() != aspect_ratio.lower():
-                    continue
-                result.append({"resolution": r, "aspect_ratio": ratio})
-
-            return sorted(result, key=lambda r: tuple(map(int, r["resolution"].split("x"))))
-
-        except Exception as e:
-            Logger.error(f"Error listing resolutions: {e}", category="camera")
-            return []
-
-    @staticmethod
-    def get_libcamera_resolutions(aspect_ratio: str = None):
         """
-        Returns a sorted list of available libcamera resolutions (known + parsed),
-        each with its aspect ratio. Optionally filters by aspect ratio.
+        Returns cached resolutions (with per-mode metadata) for the configured
+        camera. Probing happens in the background, see ResolutionCache.
         """
-        try:
-            known = [ 
-                "1280x720", 
-                "640x360", 
-                "320x180", 
-                "1024x768" 
-            ]
-
-            output = subprocess.check_output(["libcamera-hello", "--list-cameras"], text=True)
-            resolutions = set()
-
-            resolutions.update(known)
-
-            for line in output.splitlines():
-                match = re.search(r"(\d{3,5}x\d{3,5})", line)
-                if match:
-                    resolutions.add(match.group(1))
-
-            result = []
-            for res in resolutions:
-                ar = Camera._aspect_ratio(res)
-                if aspect_ratio and ar.lower() != aspect_ratio.lower():
-                    continue
-                result.append({"resolution": res, "aspect_ratio": ar})
-
-            return sorted(result, key=lambda r: tuple(map(int, r["resolution"].split("x"))))
-
-        except Exception as e:
-            Logger.warning(f"Failed to list libcamera resolutions: {e}", category="camera")
-            return []
+        return ResolutionCache.get(aspect_ratio)
 
 
     @staticmethod
     def get_capture_mode():
-        for proc in psutil.process_iter(["cmdline"]):
-            cmd = " ".join(proc.info["cmdline"] or [])
-            if "capture.py" in cmd:
-                return "capture"
-            if "mjpg_streamer" in cmd:
-                return "streaming"
-            if "libcamera-vid" in cmd and "streamer_relay.py" in cmd:
-                return "streaming"
+        if any(camera.is_running() for camera in Camera._instances.values()):
+            return "capture"
+        if ProcessRegistry.is_alive("streamer"):
+            return "streaming"
         return "none"
 
     @staticmethod
-    def timestamp_from_name(filename):
-        try:
-            name = Path(filename).stem
-            return datetime.strptime(name, "%Y%m%d-%H%M%S")
-        except Exception as e:
-            Logger.warning(f"Invalid filename timestamp: {filename} ({e})", category="camera")
-            return None
+    def frame_name(dt: datetime) -> str:
+        """Millisecond-resolution frame filename, e.g. 20250101-120000-123.jpg"""
+        return f"{dt.strftime('%Y%m%d-%H%M%S')}-{dt.microsecond // 1000:03d}.jpg"
+
+    @staticmethod
+    def timestamp_from_name(filename, warn=True):
+        """Parse both the millisecond and the older one-second frame filename formats."""
+        name = Path(filename).stem
+        for fmt in ("%Y%m%d-%H%M%S-%f", "%Y%m%d-%H%M%S"):
+            try:
+                return datetime.strptime(name, fmt)
+            except ValueError:
+                continue
+        if warn:
+            Logger.warning(f"Invalid filename timestamp: {filename}", category="camera")
+        return None
 
     @staticmethod
-    def remove_temp_images():
-        # Remove Temp Paths
-        for path in [Camera._preview_path, Camera._compare_path, Config.get("latest_symlink")]:
+    def remove_temp_images(name: str = None):
+        # Remove Temp Paths, for one camera or all of them
+        paths = set()
+        if name in (None, Camera.DEFAULT):
+            paths.add(Config.get("latest_symlink"))
+        for camera in ([Camera.get_instance(name)] if name else Camera.all()):
+            paths |= {camera._preview_path, camera.get_latest_path()}
+        for path in paths:
             try:
                 if path.exists():
                     path.unlink()
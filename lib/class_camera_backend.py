@@ -0,0 +1,548 @@
+import io
+import json
+import time
+import tempfile
+import threading
+import subprocess
+import urllib.request
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from PIL import Image
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+
+try:
+    from picamera2 import Picamera2
+except ImportError:
+    Picamera2 = None
+
+
+class CameraBackend(ABC):
+    """
+    Base class for camera backends. A backend is opened once when a capture
+    session starts and asked for frames on demand until it is closed.
+
+    Device settings are read through setting(key, default), which is
+    Config.get for the default camera and the per-camera overrides for
+    named cameras.
+    """
+    name = "base"
+
+    def __init__(self, setting=None):
+        self.setting = setting or Config.get
+        self._lock = threading.Lock()
+        self._open = False
+
+    def open(self):
+        self._open = True
+
+    def close(self):
+        self._open = False
+
+    def is_open(self) -> bool:
+        return self._open
+
+    def lock_exposure(self) -> dict:
+        """
+        Meter exposure, white balance and focus once, then reuse them for
+        every following frame. Calling it again re-meters. Returns the
+        locked values, or None if this backend cannot lock.
+        """
+        return None
+
+    @abstractmethod
+    def capture_bytes(self, resolution: str) -> bytes:
+        """Return one encoded JPEG frame at resolution, or None on failure."""
+
+    def capture(self, path: Path, resolution: str) -> bool:
+        data = self.capture_bytes(resolution)
+        if not data:
+            return False
+        try:
+            with open(path, "wb") as f:
+                f.write(data)
+            return True
+        except Exception as e:
+            Logger.error(f"Failed to write frame {path}: {e}", category="camera")
+            return False
+
+    @staticmethod
+    def _exposure_from_metadata(metadata: dict) -> dict:
+        """Normalise libcamera frame metadata into the values we lock and record."""
+        if not metadata or "ExposureTime" not in metadata:
+            return None
+        gains = metadata.get("ColourGains")
+        lens = metadata.get("LensPosition")
+        return {
+            "exposure_time_us": int(metadata["ExposureTime"]),
+            "analogue_gain": round(float(metadata.get("AnalogueGain", 1.0)), 3),
+            "colour_gains": [round(float(g), 3) for g in gains] if gains else None,
+            "lens_position": round(float(lens), 3) if lens is not None else None,
+            "measured_at": datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _parse_resolution(resolution: str, fallback=(1920, 1080)):
+        try:
+            width, height = map(int, resolution.lower().split("x"))
+            return width, height
+        except Exception:
+            return fallback
+
+    # ------------------ Factory ------------------
+
+    @staticmethod
+    def create(camera_type: str = None, high_rate: bool = False, setting=None,
+               process_name: str = "capture") -> "CameraBackend":
+        setting = setting or Config.get
+        camera_type = camera_type or setting("camera_type", "usb")
+
+        if high_rate and camera_type != "synthetic":
+            return VideoStreamBackend(camera_type, setting("high_rate_fps"), setting, process_name)
+
+        if camera_type == "libcamera":
+            if Picamera2 is not None:
+                return Picamera2Backend(setting)
+            Logger.warning("picamera2 not available, falling back to libcamera-still per frame", category="camera")
+            return LibcameraStillBackend(setting)
+        if camera_type == "libcamera-still":
+            return LibcameraStillBackend(setting)
+        if camera_type == "synthetic":
+            return SyntheticBackend(setting)
+        return FswebcamBackend(setting)
+
+
+class Picamera2Backend(CameraBackend):
+    """
+    In-process libcamera session. The sensor is initialised and AE/AF are
+    settled once on open; every capture after that just grabs the next frame.
+
+    The pipeline is configured once with a main stream at the capture
+    resolution and a lores stream at the preview resolution. Previews are
+    taken from lores (luma only, which is all change detection uses), so
+    alternating preview and full captures never restarts the pipeline.
+    """
+    name = "picamera2"
+
+    def __init__(self, setting=None):
+        super().__init__(setting)
+        self._cam = None
+        self._size = None
+        self._lores = None
+        self._locked = None
+
+    def open(self):
+        with self._lock:
+            if self._cam is not None:
+                return
+            self._cam = Picamera2(self.setting("camera_num", 0))
+            self._open = True
+            Logger.info("Persistent libcamera session opened", category="camera")
+
+    def close(self):
+        with self._lock:
+            if self._cam is None:
+                return
+            try:
+                self._cam.stop()
+                self._cam.close()
+            except Exception as e:
+                Logger.warning(f"Error closing libcamera session: {e}", category="camera")
+            finally:
+                self._cam = None
+                self._size = None
+                self._lores = None
+                self._locked = None
+                self._open = False
+                Logger.info("Persistent libcamera session closed", category="camera")
+
+    def _configure(self, size):
+        if self._size == size:
+            return
+        if self._size is not None:
+            self._cam.stop()
+        # lores must not exceed main and needs even dimensions
+        pw, ph = self._parse_resolution(self.setting("preview_resolution"), (320, 240))
+        lores = (min(pw, size[0]) & ~1, min(ph, size[1]) & ~1)
+        config = self._cam.create_still_configuration(
+            main={"size": size},
+            lores={"size": lores, "format": "YUV420"}
+        )
+        self._cam.configure(config)
+        self._cam.start()
+        if self._locked:
+            self._apply_lock(self._locked)
+        else:
+            try:
+                # AfModeContinuous / AfRangeNormal; cameras without AF reject these
+                self._cam.set_controls({"AfMode": 2, "AfRange": 0})
+            except Exception:
+                pass
+        self._size = size
+        self._lores = lores
+        Logger.debug(
+            f"libcamera session configured for {size[0]}x{size[1]} (preview {lores[0]}x{lores[1]})",
+            category="camera"
+        )
+
+    def _capture_lores(self, size) -> bytes:
+        w, h = self._lores
+        # YUV420 comes back as one array; the first h rows are the Y plane (padded to the stride)
+        img = Image.fromarray(self._cam.capture_array("lores")[:h, :w])
+        if img.size != size:
+            img = img.resize(size)
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=90)
+        return buf.getvalue()
+
+    def _apply_lock(self, values: dict):
+        controls = {
+            "AeEnable": False,
+            "ExposureTime": values["exposure_time_us"],
+            "AnalogueGain": values["analogue_gain"]
+        }
+        if values["colour_gains"]:
+            controls.update({"AwbEnable": False, "ColourGains": tuple(values["colour_gains"])})
+        self._cam.set_controls(controls)
+        if values["lens_position"] is not None:
+            try:
+                # AfModeManual
+                self._cam.set_controls({"AfMode": 0, "LensPosition": values["lens_position"]})
+            except Exception:
+                pass
+
+    def lock_exposure(self, settle_frames: int = 30) -> dict:
+        with self._lock:
+            if self._cam is None:
+                return None
+            try:
+                self._configure(self._parse_resolution(self.setting("resolution")))
+                if self._locked:
+                    self._locked = None
+                    self._cam.set_controls({"AeEnable": True, "AwbEnable": True})
+                try:
+                    self._cam.autofocus_cycle()
+                except Exception:
+                    pass
+                metadata = None
+                for _ in range(settle_frames):
+                    metadata = self._cam.capture_metadata()
+                    if metadata.get("AeLocked"):
+                        break
+                values = self._exposure_from_metadata(metadata)
+                if values:
+                    self._apply_lock(values)
+                    self._locked = values
+                return values
+            except Exception as e:
+                Logger.error(f"Exposure lock failed: {e}", category="camera")
+                return None
+
+    def capture_bytes(self, resolution: str) -> bytes:
+        with self._lock:
+            if self._cam is None:
+                Logger.error("libcamera session is not open", category="camera")
+                return None
+            try:
+                size = self._parse_resolution(resolution)
+                if self._size is None:
+                    self._configure(self._parse_resolution(self.setting("resolution")))
+                if size != self._size and size[0] <= self._lores[0] and size[1] <= self._lores[1]:
+                    return self._capture_lores(size)
+                self._configure(size)
+                buf = io.BytesIO()
+                self._cam.capture_file(buf, format="jpeg")
+                return buf.getvalue()
+            except Exception as e:
+                Logger.error(f"libcamera capture failed: {e}", category="camera")
+                return None
+
+
+class SubprocessBackend(CameraBackend):
+    """
+    Fallback backend that launches one capture process per frame.
+    """
+    name = "subprocess"
+
+    @abstractmethod
+    def _build_cmd(self, output: str, resolution: str) -> list:
+        """Command line that writes one frame to output ("-" for stdout)."""
+
+    def capture(self, path: Path, resolution: str) -> bool:
+        cmd = self._build_cmd(str(path), resolution)
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return result.returncode == 0
+
+    def capture_bytes(self, resolution: str) -> bytes:
+        cmd = self._build_cmd("-", resolution)
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        if result.returncode != 0 or not result.stdout:
+            return None
+        return result.stdout
+
+
+class LibcameraStillBackend(SubprocessBackend):
+    """
+    One libcamera-still process per frame. Unlocked, every frame runs
+    autofocus and AE/AWB convergence for the full timeout; once exposure
+    is locked the metered shutter, gain, AWB gains and lens position are
+    passed explicitly and the frame is taken immediately.
+    """
+    name = "libcamera-still"
+
+    def __init__(self, setting=None):
+        super().__init__(setting)
+        self._locked = None
+
+    def _build_cmd(self, output: str, resolution: str) -> list:
+        width, height = self._parse_resolution(resolution)
+        cmd = [
+            "libcamera-still",
+            "--camera", str(self.setting("camera_num", 0))
+        ]
+        if self._locked:
+            cmd += self._locked_args(self._locked)
+        else:
+            cmd += [
+                "--autofocus-mode", "auto",
+                "--autofocus-range", "normal",
+                "--lens-position", "0.0",
+                "--timeout", "3000"
+            ]
+        return cmd + [
+            "--width", str(width),
+            "--height", str(height),
+            "-o", output
+        ]
+
+    @staticmethod
+    def _locked_args(values: dict) -> list:
+        args = [
+            "--shutter", str(values["exposure_time_us"]),
+            "--gain", str(values["analogue_gain"]),
+            "--timeout", "1",
+            "--immediate"
+        ]
+        if values["colour_gains"]:
+            args += ["--awbgains", ",".join(str(g) for g in values["colour_gains"])]
+        if values["lens_position"] is not None:
+            args += ["--autofocus-mode", "manual", "--lens-position", str(values["lens_position"])]
+        return args
+
+    def lock_exposure(self) -> dict:
+        # Meter with a normal auto capture and read back what it converged to
+        self._locked = None
+        with tempfile.NamedTemporaryFile(suffix=".json") as meta:
+            cmd = self._build_cmd("-", self.setting("resolution")) + ["--metadata", meta.name]
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if result.returncode != 0:
+                Logger.error("Exposure metering capture failed", category="camera")
+                return None
+            try:
+                metadata = json.load(meta)
+            except ValueError as e:
+                Logger.error(f"Unreadable exposure metadata: {e}", category="camera")
+                return None
+        self._locked = self._exposure_from_metadata(metadata)
+        return self._locked
+
+
+class FswebcamBackend(SubprocessBackend):
+    name = "fswebcam"
+
+    def _build_cmd(self, output: str, resolution: str) -> list:
+        return [
+            "fswebcam",
+            "--no-banner",
+            "-d", self.setting("video_device", "/dev/video0"),
+            "-r", resolution,
+            output
+        ]
+
+
+class VideoStreamBackend(CameraBackend):
+    """
+    High-rate backend: one continuous MJPEG video pipeline (libcamera-vid,
+    or ffmpeg for USB cameras) whose frames are handed out on demand.
+    The requested resolution is fixed when the pipeline opens.
+    """
+    name = "mjpeg-video"
+
+    def __init__(self, camera_type: str, fps: int, setting=None, process_name: str = "capture"):
+        super().__init__(setting)
+        self.camera_type = camera_type
+        self.fps = max(1, int(fps))
+        self.process_name = process_name
+        self._reader = None
+        self._seq = 0
+
+    def _build_cmd(self, resolution: str) -> list:
+        width, height = self._parse_resolution(resolution)
+        if self.camera_type.startswith("libcamera"):
+            return [
+                "libcamera-vid",
+                "--camera", str(self.setting("camera_num", 0)),
+                "--codec", "mjpeg",
+                "-t", "0",
+                "--nopreview",
+                "--framerate", str(self.fps),
+                "--width", str(width),
+                "--height", str(height),
+                "-o", "-"
+            ]
+        return [
+            "ffmpeg", "-loglevel", "error",
+            "-f", "v4l2", "-input_format", "mjpeg",
+            "-framerate", str(self.fps),
+            "-video_size", f"{width}x{height}",
+            "-i", self.setting("video_device", "/dev/video0"),
+            "-c:v", "copy", "-f", "mjpeg", "-"
+        ]
+
+    def open(self):
+        from lib.class_process_registry import ProcessRegistry
+        from lib.class_frame_source import MjpegFrameReader
+
+        with self._lock:
+            if self._reader:
+                return
+            proc = ProcessRegistry.spawn(self.process_name, self._build_cmd(self.setting("resolution")),
+                                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            self._reader = MjpegFrameReader(proc.stdout, name=f"{self.process_name}-mjpeg")
+            self._reader.start()
+            self._seq = 0
+            self._open = True
+            Logger.info(f"MJPEG capture pipeline started at {self.fps} fps", category="camera")
+
+    def close(self):
+        from lib.class_process_registry import ProcessRegistry
+
+        with self._lock:
+            ProcessRegistry.terminate(self.process_name)
+            if self._reader:
+                self._reader.stop()
+                self._reader = None
+            self._open = False
+
+    def capture_bytes(self, resolution: str) -> bytes:
+        if not self._reader:
+            Logger.error("MJPEG capture pipeline is not open", category="camera")
+            return None
+        self._seq, frame = self._reader.next_frame(self._seq, timeout=max(2.0, 5.0 / self.fps))
+        return frame
+
+
+class StreamTapBackend(CameraBackend):
+    """
+    Pulls frames from the running MJPEG streamer (streamer_relay.py or
+    mjpg_streamer) so capture can share the sensor with live streaming.
+    Frames come at the streamer's resolution; reconnects if the feed drops.
+    """
+    name = "stream-tap"
+
+    def __init__(self, url: str, timeout: float = 5):
+        super().__init__()
+        self.url = url
+        self.timeout = timeout
+        self._response = None
+        self._reader = None
+        self._seq = 0
+
+    def open(self):
+        from lib.class_frame_source import MjpegFrameReader
+
+        with self._lock:
+            if self._reader and self._reader.is_alive():
+                return
+            self._disconnect()
+            try:
+                self._response = urllib.request.urlopen(self.url, timeout=self.timeout)
+            except Exception as e:
+                Logger.error(f"Failed to connect to stream {self.url}: {e}", category="camera")
+                return
+            self._reader = MjpegFrameReader(self._response, name="stream-tap")
+            self._reader.start()
+            self._seq = 0
+            self._open = True
+            Logger.info(f"Tapping live stream at {self.url}", category="camera")
+
+    def _disconnect(self):
+        if self._reader:
+            self._reader.stop(timeout=0)
+            self._reader = None
+        if self._response:
+            try:
+                self._response.close()
+            except Exception:
+                pass
+            self._response = None
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+            self._open = False
+
+    def capture_bytes(self, resolution: str) -> bytes:
+        if not self._reader or not self._reader.is_alive():
+            self.open()
+            if not self._reader:
+                return None
+        self._seq, frame = self._reader.next_frame(self._seq, timeout=self.timeout)
+        return frame
+
+
+class SyntheticBackend(CameraBackend):
+    """
+    Camera-less backend producing deterministic JPEG frames: a fixed
+    gradient scene with a square that moves synthetic_motion pixels per
+    frame, after an artificial synthetic_latency_ms capture delay.
+    """
+    name = "synthetic"
+
+    def __init__(self, setting=None):
+        super().__init__(setting)
+        self.motion = self.setting("synthetic_motion")
+        self.latency = self.setting("synthetic_latency_ms") / 1000
+        self.frame_index = 0
+        self._scenes = {}
+
+    def open(self):
+        self.frame_index = 0
+        self._open = True
+
+    def lock_exposure(self) -> dict:
+        # Fixed values so the locking path can be exercised without a sensor
+        return self._exposure_from_metadata({
+            "ExposureTime": 10000,
+            "AnalogueGain": 1.0,
+            "ColourGains": [1.5, 1.2],
+            "LensPosition": 0.0
+        })
+
+    def _scene(self, size):
+        if size not in self._scenes:
+            vertical = Image.linear_gradient("L").resize(size)
+            horizontal = Image.linear_gradient("L").rotate(90).resize(size)
+            self._scenes[size] = Image.merge("RGB", (vertical, horizontal, vertical.transpose(Image.Transpose.FLIP_TOP_BOTTOM)))
+        return self._scenes[size]
+
+    def render(self, size, index: int) -> Image.Image:
+        width, height = size
+        img = self._scene(size).copy()
+        box = max(8, min(width, height) // 4)
+        x = (index * self.motion) % max(1, width - box)
+        y = (height - box) // 2
+        img.paste((255, 64, 0), (x, y, x + box, y + box))
+        return img
+
+    def capture_bytes(self, resolution: str) -> bytes:
+        with self._lock:
+            if self.latency:
+                time.sleep(self.latency)
+            img = self.render(self._parse_resolution(resolution), self.frame_index)
+            self.frame_index += 1
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=85)
+            return buf.getvalue()
@@ -0,0 +1,195 @@
+from PIL import Image, ImageChops, ImageStat
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ChangeDetector:
+    """
+    Compares greyscale preview frames against an in-memory baseline.
+
+    Uses NumPy when available and falls back to Pillow's ImageStat, both of
+    which compute the statistics without a Python-level per-pixel loop.
+    """
+
+    def __init__(self, grid=(4, 3), block_threshold=15.0, block_thresholds=None,
+                 include=None, exclude=None, min_blocks=0):
+        self.grid = grid
+        self.block_threshold = block_threshold
+        self.min_blocks = min_blocks
+        self._baseline = None
+        self._size = None
+        self._thresholds = self._build_thresholds(block_thresholds or {})
+        self._mask = self._build_mask(include or [], exclude or [])
+
+    @classmethod
+    def from_config(cls) -> "ChangeDetector":
+        return cls(
+            grid=cls.parse_grid(Config.get("change_grid")),
+            block_threshold=Config.get("change_block_threshold"),
+            block_thresholds=Config.get("change_block_thresholds"),
+            include=Config.get("change_mask_include"),
+            exclude=Config.get("change_mask_exclude"),
+            min_blocks=Config.get("change_min_blocks")
+        )
+
+    @staticmethod
+    def parse_grid(grid: str, fallback=(4, 3)):
+        try:
+            cols, rows = map(int, str(grid).lower().split("x"))
+            if cols > 0 and rows > 0:
+                return cols, rows
+        except Exception:
+            pass
+        Logger.warning(f"Invalid change grid '{grid}', using {fallback[0]}x{fallback[1]}", category="camera")
+        return fallback
+
+    def _block_index(self, key) -> int:
+        """Map a "col,row" key to a row-major block index, or None if outside the grid."""
+        try:
+            col, row = map(int, str(key).split(","))
+        except ValueError:
+            Logger.warning(f"Invalid block key '{key}', expected 'col,row'", category="camera")
+            return None
+        cols, rows = self.grid
+        if 0 <= col < cols and 0 <= row < rows:
+            return row * cols + col
+        return None
+
+    def _build_thresholds(self, overrides: dict) -> list:
+        cols, rows = self.grid
+        thresholds = [self.block_threshold] * (cols * rows)
+        for key, value in overrides.items():
+            idx = self._block_index(key)
+            if idx is not None:
+                thresholds[idx] = float(value)
+        return thresholds
+
+    def _build_mask(self, include: list, exclude: list) -> list:
+        cols, rows = self.grid
+        total = cols * rows
+        if include:
+            mask = [False] * total
+            for key in include:
+                idx = self._block_index(key)
+                if idx is not None:
+                    mask[idx] = True
+        else:
+            mask = [True] * total
+
+        for key in exclude:
+            idx = self._block_index(key)
+            if idx is not None:
+                mask[idx] = False
+        return mask
+
+    def has_baseline(self) -> bool:
+        return self._baseline is not None
+
+    def reset(self):
+        self._baseline = None
+        self._size = None
+
+    def set_baseline(self, image: Image.Image):
+        image = self._prepare(image)
+        self._size = image.size
+        self._baseline = np.asarray(image, dtype=np.int16) if np is not None else image
+
+    def compare(self, image: Image.Image) -> dict:
+        """
+        Return {"rms", "mad", "blocks", "changed"} for image against the
+        baseline. blocks is a row-major list of per-block RMS values over the
+        grid and changed lists the unmasked blocks above their threshold.
+        """
+        if self._baseline is None:
+            raise RuntimeError("No baseline set for change detection")
+
+        image = self._prepare(image)
+        if image.size != self._size:
+            image = image.resize(self._size)
+
+        result = self._compare_numpy(image) if np is not None else self._compare_imagestat(image)
+        result["changed"] = [
+            i for i, value in enumerate(result["blocks"])
+            if self._mask[i] and value >= self._thresholds[i]
+        ]
+        return result
+
+    def triggered(self, result: dict, threshold: float) -> bool:
+        """
+        With min_blocks set, a change needs that many unmasked blocks over
+        their threshold; otherwise fall back to the global RMS threshold.
+        """
+        if self.min_blocks > 0:
+            return len(result["changed"]) >= self.min_blocks
+        return result["rms"] >= threshold
+
+    def heatmap(self, result: dict) -> dict:
+        cols, rows = self.grid
+        blocks = result.get("blocks") or [0.0] * (cols * rows)
+        return {
+            "grid": [cols, rows],
+            "rms": round(result.get("rms", 0.0), 2),
+            "blocks": [blocks[r * cols:(r + 1) * cols] for r in range(rows)],
+            "changed": result.get("changed", []),
+            "mask": self._mask
+        }
+
+    @staticmethod
+    def _prepare(image: Image.Image) -> Image.Image:
+        return image if image.mode == "L" else image.convert("L")
+
+    def _compare_numpy(self, image: Image.Image) -> dict:
+        diff = np.asarray(image, dtype=np.int16) - self._baseline
+        sq = diff.astype(np.int32) ** 2
+
+        cols, rows = self.grid
+        h, w = sq.shape
+        bh, bw = h // rows, w // cols
+        blocks = []
+        if bh and bw:
+            means = sq[:bh * rows, :bw * cols].reshape(rows, bh, cols, bw).mean(axis=(1, 3))
+            blocks = [round(float(v), 2) for v in np.sqrt(means).ravel()]
+
+        return {
+            "rms": float(np.sqrt(sq.mean())),
+            "mad": float(np.abs(diff).mean()),
+            "blocks": blocks
+        }
+
+    def _compare_imagestat(self, image: Image.Image) -> dict:
+        diff = ImageChops.difference(image, self._baseline)
+        stat = ImageStat.Stat(diff)
+
+        cols, rows = self.grid
+        w, h = diff.size
+        bw, bh = w // cols, h // rows
+        blocks = []
+        for r in range(rows if bw and bh else 0):
+            for c in range(cols):
+                box = (c * bw, r * bh, (c + 1) * bw, (r + 1) * bh)
+                blocks.append(round(ImageStat.Stat(diff.crop(box)).rms[0], 2))
+
+        return {
+            "rms": stat.rms[0],
+            "mad": stat.mean[0],
+            "blocks": blocks
+        }
+
+    @staticmethod
+    def engine() -> str:
+        return "numpy" if np is not None else "imagestat"
+
+    @staticmethod
+    def load(path) -> Image.Image:
+        try:
+            with Image.open(path) as img:
+                return img.convert("L")
+        except Exception as e:
+            Logger.error(f"Failed to load preview {path}: {e}", category="camera")
+            return None
@@ -14,11 +14,56 @@ class Config:
         "video_device": "/dev/video0",
         "log_level": "DEBUG",
         "interval": 30,
+        "missed_tick_policy": "skip",
+        "high_rate_enabled": False,
+        "high_rate_fps": 5,
+        "stream_tap_enabled": True,
+        "stream_tap_stall_seconds": 30.0,
+        "burst_enabled": False,
+        "burst_interval": 0.5,
+        "burst_duration": 10.0,
+        "burst_pre_frames": 5,
+        "burst_memory_mb": 32,
+        "rolling_window_hours": 0,
+        "rolling_window_frames": 0,
+        "adaptive_interval_enabled": False,
+        "adaptive_interval_factor": 2.0,
+        "adaptive_interval_max": 600,
+        "postprocess_queue_size": 32,
+        "postprocess_overflow": "block",
+        "metrics_enabled": False,
+        "staging_enabled": False,
+        "staging_path": "/dev/shm/timelapse-staging",
+        "staging_ram_mb": 64,
+        "staging_flush_seconds": 10.0,
+        "staging_flush_frames": 50,
+        "staging_fsync": "batch",
+        "session_checkpoint_seconds": 30.0,
+        "exposure_lock_enabled": False,
+        "exposure_lock_refresh_minutes": 0,
+        "cameras": {},
+        "camera_num": 0,
+        "throttle_enabled": True,
+        "throttle_temp_levels": [70.0, 75.0, 80.0],
+        "throttle_load_levels": [1.0, 1.5, 2.0],
+        "throttle_overrun_levels": [0.2, 0.4, 0.6],
+        "throttle_hysteresis": 0.05,
+        "throttle_hold_seconds": 60,
+        "throttle_sample_seconds": 5,
         "auto_stop_enabled": False,
         "auto_stop_after_idle_minutes": 60,
         "change_detection_enabled": True,
         "change_threshold": 10.0,
+        "single_exposure_enabled": False,
+        "change_grid": "4x3",
+        "change_block_threshold": 15.0,
+        "change_block_thresholds": {},
+        "change_mask_include": [],
+        "change_mask_exclude": [],
+        "change_min_blocks": 0,
         "camera_type": "libcamera",
+        "synthetic_motion": 16,
+        "synthetic_latency_ms": 50,
         "autofocus_mode": "normal",
         "resolution": "1600x1200",
         "preview_resolution": "320x240",
@@ -36,11 +81,11 @@ class Config:
     }
 
     _types = {
-        str:   ['resolution', 'preview_resolution', 'network_mode', 'log_level', 'video_device', 'bt_device_name', "camera_type", "autofocus_mode"],
-        Path:  ['storage_path', 'download_path', 'log_path', 'latest_symlink'],
-        int:   ['interval', 'auto_stop_after_idle_minutes', 'storage_threshold', 'temp_retention_minutes'],
-        float: ['change_threshold'],
-        bool:  ['auto_stop_enabled', 'change_detection_enabled', 'debug', 'bt_enabled', 'bt_autoconnect', "developer"],
+        str:   ['resolution', 'preview_resolution', 'network_mode', 'log_level', 'video_device', 'bt_device_name', "camera_type", "autofocus_mode", "change_grid", "missed_tick_policy", "postprocess_overflow", "staging_fsync"],
+        Path:  ['storage_path', 'download_path', 'log_path', 'latest_symlink', 'staging_path'],
+        int:   ['auto_stop_after_idle_minutes', 'storage_threshold', 'temp_retention_minutes', 'change_min_blocks', 'postprocess_queue_size', 'adaptive_interval_max', 'high_rate_fps', 'burst_pre_frames', 'burst_memory_mb', 'rolling_window_frames', 'camera_num', 'staging_ram_mb', 'staging_flush_frames', 'throttle_hold_seconds', 'throttle_sample_seconds', 'synthetic_motion', 'synthetic_latency_ms'],
+        float: ['interval', 'change_threshold', 'change_block_threshold', 'adaptive_interval_factor', 'burst_interval', 'burst_duration', 'rolling_window_hours', 'staging_flush_seconds', 'stream_tap_stall_seconds', 'session_checkpoint_seconds', 'exposure_lock_refresh_minutes', 'throttle_hysteresis'],
+        bool:  ['auto_stop_enabled', 'change_detection_enabled', 'single_exposure_enabled', 'high_rate_enabled', 'stream_tap_enabled', 'burst_enabled', 'adaptive_interval_enabled', 'metrics_enabled', 'staging_enabled', 'exposure_lock_enabled', 'throttle_enabled', 'debug', 'bt_enabled', 'bt_autoconnect', "developer"],
     }
 
     _type_map = {k: t for t, keys in _types.items() for k in keys}
@@ -158,6 +203,10 @@ class Config:
         cls.save()
         return True
 
+    @classmethod
+    def config_dir(cls) -> Path:
+        return cls._config_path
+
     @classmethod
     def config_path(cls, filename):
         path = cls._config_path / filename
@@ -0,0 +1,83 @@
+import json
+import threading
+from pathlib import Path
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+
+
+class CounterJournal:
+    """
+    Write-ahead journal for the hot session counters.
+
+    Every frame batch appends one JSON line with the session's current
+    counters to data/config/journal/<session_id>.journal. Lines carry
+    absolute values, so replay only needs the last complete line; a torn
+    final line from a crash is ignored. The journal is truncated whenever
+    the counters are checkpointed to the session store and removed when
+    the session ends, so a journal found on boot marks a session that was
+    interrupted.
+
+    Lines are flushed to the OS but not fsynced: a crash of the app loses
+    nothing, a power cut at most the tail the kernel had not written back.
+    """
+    _files = {}
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Use classmethods only — do not instantiate CounterJournal")
+
+    @staticmethod
+    def folder() -> Path:
+        folder = Path(Config.config_path("journal"))
+        folder.mkdir(exist_ok=True)
+        return folder
+
+    @classmethod
+    def path(cls, session_id: str) -> Path:
+        return cls.folder() / f"{session_id}.journal"
+
+    @classmethod
+    def append(cls, session_id: str, counters: dict):
+        line = json.dumps(counters, separators=(",", ":")) + "\n"
+        with cls._lock:
+            f = cls._files.get(session_id)
+            if f is None:
+                f = cls._files[session_id] = open(cls.path(session_id), "a")
+            f.write(line)
+            f.flush()
+
+    @classmethod
+    def truncate(cls, session_id: str):
+        """Drop entries already checkpointed; the (empty) journal stays until the session ends."""
+        with cls._lock:
+            f = cls._files.get(session_id)
+            if f is not None:
+                f.seek(0)
+                f.truncate()
+
+    @classmethod
+    def remove(cls, session_id: str):
+        with cls._lock:
+            f = cls._files.pop(session_id, None)
+            if f is not None:
+                f.close()
+        cls.path(session_id).unlink(missing_ok=True)
+
+    @classmethod
+    def replay(cls) -> dict:
+        """Return {session_id: last journaled counters or None} for every journal on disk."""
+        found = {}
+        for journal in sorted(cls.folder().glob("*.journal")):
+            last = None
+            try:
+                with journal.open("r") as f:
+                    for line in f:
+                        try:
+                            last = json.loads(line)
+                        except ValueError:
+                            break  # torn tail
+            except OSError as e:
+                Logger.warning(f"Could not read counter journal {journal.name}: {e}", category="session")
+            found[journal.stem] = last
+        return found
@@ -0,0 +1,54 @@
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class FrameRingBuffer:
+    """
+    Bounded in-memory ring of encoded JPEG frames (bytes, never decoded
+    images). The oldest frames are evicted once either the frame count or
+    the byte budget is exceeded.
+    """
+
+    def __init__(self, max_frames: int, max_bytes: int):
+        self.max_frames = max(0, max_frames)
+        self.max_bytes = max(0, max_bytes)
+        self._frames = deque()
+        self._bytes = 0
+        self._evicted = 0
+        self._lock = threading.Lock()
+
+    def push(self, frame: bytes, captured_at: datetime = None):
+        if not self.max_frames or len(frame) > self.max_bytes:
+            return
+        with self._lock:
+            self._frames.append((captured_at or datetime.now(), frame))
+            self._bytes += len(frame)
+            while len(self._frames) > self.max_frames or self._bytes > self.max_bytes:
+                _, old = self._frames.popleft()
+                self._bytes -= len(old)
+                self._evicted += 1
+
+    def drain(self) -> list:
+        """Return buffered (captured_at, frame) pairs oldest first and empty the buffer."""
+        with self._lock:
+            frames = list(self._frames)
+            self._frames.clear()
+            self._bytes = 0
+        return frames
+
+    def clear(self):
+        self.drain()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "frames": len(self._frames),
+                "bytes": self._bytes,
+                "max_frames": self.max_frames,
+                "max_bytes": self.max_bytes,
+                "evicted": self._evicted
+            }
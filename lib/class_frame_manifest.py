@@ -0,0 +1,185 @@
+import os
+import bisect
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from lib.class_logging import Logger
+
+
+class FrameManifest:
+    """
+    Append-only list of the frames in a session folder, so listing, first
+    and last frame and total size never have to glob or sort the folder.
+
+    manifest.tsv holds one tab-separated line per frame, in capture order
+    (entries are re-sorted by timestamp when read should they ever be
+    appended out of order):
+
+        <timestamp>  <filename>  <size>  <change score or empty>
+
+    Frames deleted later (rolling window) are recorded as a "-<filename>"
+    tombstone line instead of rewriting the file; compact() drops them.
+    A torn last line from a crash is ignored. When the file is missing it
+    is rebuilt from the folder, which is also what bin/repairManifest.py
+    does on demand.
+    """
+    FILENAME = "manifest.tsv"
+
+    # path -> parsed frames and how far the file has been read, shared by every
+    # handle; least recently used first, bounded so months of sessions are not kept resident
+    CACHE_SIZE = 8
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, folder: Path):
+        self.folder = Path(folder)
+        self.path = self.folder / self.FILENAME
+        self._file = None
+        self._tombstones = 0
+
+    # ------------------ Writing ------------------
+
+    def append(self, frames: list):
+        """Record (path, size, timestamp datetime, score or None) frames."""
+        lines = "".join(
+            f"{ts.isoformat()}\t{Path(path).name}\t{size}\t{'' if score is None else round(score, 2)}\n"
+            for path, size, ts, score in frames
+        )
+        self._write(lines)
+
+    def remove(self, filename: str):
+        self._write(f"-{filename}\n")
+        self._tombstones += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, text: str):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(text)
+        self._file.flush()
+
+    # ------------------ Reading ------------------
+
+    def entries(self) -> list:
+        """Frames as (timestamp, filename, size, score) in capture order."""
+        return self._load()["list"]
+
+    def between(self, start: str, end: str) -> list:
+        """Frames with start <= timestamp <= end (ISO strings), by binary search."""
+        cached = self._load()
+        times = cached["times"]
+        return cached["list"][bisect.bisect_left(times, start):bisect.bisect_right(times, end)]
+
+    def _load(self) -> dict:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            if not self.folder.is_dir():
+                # Session without a capture folder: nothing listed, nothing cached
+                return {"ino": None, "offset": 0, "frames": {}, "list": [], "times": []}
+            self.rebuild()
+            st = self.path.stat()
+
+        with self._cache_lock:
+            cached = self._cache.get(self.path)
+            if cached is None or cached["ino"] != st.st_ino or cached["offset"] > st.st_size:
+                cached = self._cache[self.path] = {"ino": st.st_ino, "offset": 0, "frames": {}, "list": [], "times": []}
+            self._cache.move_to_end(self.path)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+            if cached["offset"] < st.st_size:
+                # The file only grows between rewrites: parse just the new lines
+                with open(self.path, "rb") as f:
+                    f.seek(cached["offset"])
+                    tail = f.read()
+                complete = tail.rfind(b"\n") + 1
+                self._parse(tail[:complete].decode(), cached["frames"])
+                cached["offset"] += complete
+                entries = list(cached["frames"].values())
+                times = [e[0] for e in entries]
+                if any(a > b for a, b in zip(times, times[1:])):
+                    # Appends arrived out of capture order; between() relies on sorted times
+                    entries.sort(key=lambda e: e[0])
+                    times.sort()
+                cached["list"], cached["times"] = entries, times
+            return cached
+
+    @classmethod
+    def forget(cls, folder: Path):
+        """Drop the cached entries of a deleted session folder."""
+        with cls._cache_lock:
+            cls._cache.pop(Path(folder) / cls.FILENAME, None)
+
+    def paths(self) -> list:
+        return [self.folder / e[1] for e in self.entries()]
+
+    def first(self) -> tuple:
+        entries = self.entries()
+        return entries[0] if entries else None
+
+    def last(self) -> tuple:
+        entries = self.entries()
+        return entries[-1] if entries else None
+
+    def total_bytes(self) -> int:
+        return sum(e[2] for e in self.entries())
+
+    @staticmethod
+    def _parse(text: str, frames: dict = None) -> dict:
+        frames = {} if frames is None else frames
+        for line in text.split("\n"):
+            if line.startswith("-"):
+                frames.pop(line[1:], None)
+                continue
+            parts = line.split("\t")
+            if len(parts) != 4:
+                continue  # blank or torn
+            try:
+                frames[parts[1]] = (parts[0], parts[1], int(parts[2]), float(parts[3]) if parts[3] else None)
+            except ValueError:
+                continue
+        return frames
+
+    # ------------------ Maintenance ------------------
+
+    def rebuild(self) -> int:
+        """Rewrite the manifest from the frames actually in the folder, keeping known scores."""
+        from lib.class_camera import Camera
+
+        scores = {}
+        if self.path.exists():
+            scores = {name: e[3] for name, e in self._parse(self.path.read_text()).items()}
+
+        lines = []
+        for frame in sorted(self.folder.glob("*.jpg")):
+            ts = Camera.timestamp_from_name(frame.name, warn=False)
+            if ts is None:
+                continue  # thumbnail.jpg and anything not written by the capture loop
+            score = scores.get(frame.name)
+            lines.append(f"{ts.isoformat()}\t{frame.name}\t{frame.stat().st_size}\t{'' if score is None else score}\n")
+
+        self._replace("".join(lines))
+        Logger.info(f"Rebuilt frame manifest for {self.folder.name} ({len(lines)} frames)", category="session")
+        return len(lines)
+
+    def compact(self):
+        """Drop tombstones and the entries they cancel."""
+        if not self._tombstones:
+            return
+        self._replace("".join(f"{ts}\t{name}\t{size}\t{'' if score is None else score}\n"
+                              for ts, name, size, score in self.entries()))
+
+    def _replace(self, text: str):
+        self.close()
+        tmp = self.path.with_name(f".{self.FILENAME}.tmp")
+        with open(tmp, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._tombstones = 0
@@ -0,0 +1,90 @@
+import threading
+
+from lib.class_logging import Logger
+
+
+class MjpegFrameReader:
+    """
+    Splits a byte stream of concatenated JPEGs (raw MJPEG or multipart HTTP)
+    into frames on a reader thread and keeps only the newest one.
+    Consumers ask for the next frame newer than the one they last saw.
+    """
+    SOI = b"\xff\xd8"
+    EOI = b"\xff\xd9"
+
+    def __init__(self, stream, name: str = "mjpeg-reader", chunk_size: int = 65536):
+        self._stream = stream
+        self._name = name
+        self._chunk_size = chunk_size
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name=self._name)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    @property
+    def frames_read(self) -> int:
+        return self._seq
+
+    def next_frame(self, after_seq: int = 0, timeout: float = 5):
+        """Return (seq, jpeg_bytes) for the newest frame with seq > after_seq, or (after_seq, None) on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after_seq or not self._running, timeout=timeout):
+                return after_seq, None
+            if self._seq <= after_seq:
+                return after_seq, None
+            return self._seq, self._frame
+
+    def _read(self) -> bytes:
+        read1 = getattr(self._stream, "read1", None)
+        return read1(self._chunk_size) if read1 else self._stream.read(self._chunk_size)
+
+    def _run(self):
+        buf = bytearray()
+        try:
+            while self._running:
+                chunk = self._read()
+                if not chunk:
+                    break
+                buf += chunk
+
+                while True:
+                    start = buf.find(self.SOI)
+                    if start == -1:
+                        del buf[:-1]
+                        break
+                    end = buf.find(self.EOI, start + 2)
+                    if end == -1:
+                        del buf[:start]
+                        break
+                    self._publish(bytes(buf[start:end + 2]))
+                    del buf[:end + 2]
+        except Exception as e:
+            if self._running:
+                Logger.error(f"MJPEG reader '{self._name}' failed: {e}", category="camera")
+        finally:
+            self._running = False
+            with self._cond:
+                self._cond.notify_all()
+
+    def _publish(self, frame: bytes):
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
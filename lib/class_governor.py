@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+from collections import deque
+from datetime import datetime
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+
+
+class ThrottleGovernor:
+    """
+    Watches SoC temperature, normalised load and capture-loop overruns and
+    picks a throttle level that the capture loop and zip worker act on.
+
+    A level is raised as soon as any signal crosses its threshold. It is
+    only lowered once every signal is below its threshold minus the
+    hysteresis margin and the current level has been held for
+    throttle_hold_seconds, and then only one level at a time, so the policy
+    does not flap around a threshold.
+    """
+    LEVELS = [
+        # Change detection always stays on: without it every tick would be written
+        ("normal",   {"preview_scale": 1.0,  "interval_factor": 1.0, "pause_zips": False}),
+        ("warm",     {"preview_scale": 0.5,  "interval_factor": 1.0, "pause_zips": True}),
+        ("hot",      {"preview_scale": 0.5,  "interval_factor": 2.0, "pause_zips": True}),
+        ("critical", {"preview_scale": 0.25, "interval_factor": 4.0, "pause_zips": True}),
+    ]
+
+    _level = 0
+    _reason = None
+    _changed_at = 0.0
+    _changed_dt = None
+    _signals = {"temperature": None, "load": None, "overrun": None}
+    _ticks = {}  # camera -> recent ticks, True where the tick overran
+    _lock = threading.Lock()
+    _thread = None
+    _stop = threading.Event()
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Use classmethods only — do not instantiate ThrottleGovernor")
+
+    # ------------------ Public ------------------
+
+    @classmethod
+    def start(cls):
+        if cls._thread and cls._thread.is_alive():
+            return
+        cls._stop.clear()
+        cls._thread = threading.Thread(target=cls._run, daemon=True, name="throttle-governor")
+        cls._thread.start()
+        Logger.info("Throttle governor started", category="governor")
+
+    @classmethod
+    def stop(cls):
+        cls._stop.set()
+        if cls._thread:
+            cls._thread.join(timeout=2)
+            cls._thread = None
+
+    @classmethod
+    def level(cls) -> int:
+        return cls._level
+
+    @classmethod
+    def policy(cls) -> dict:
+        return cls.LEVELS[cls._level][1]
+
+    @classmethod
+    def should_pause_zips(cls) -> bool:
+        return cls.policy()["pause_zips"]
+
+    @classmethod
+    def record_tick(cls, duration: float, interval: float, camera: str = "default"):
+        """Called by the capture loop once per tick to track overruns."""
+        with cls._lock:
+            cls._ticks.setdefault(camera, deque(maxlen=50)).append(duration > interval)
+
+    @classmethod
+    def reset_ticks(cls, camera: str = "default"):
+        """Forget a camera's overrun history, e.g. when its capture loop restarts."""
+        with cls._lock:
+            cls._ticks.pop(camera, None)
+
+    @classmethod
+    def status(cls) -> dict:
+        name, actions = cls.LEVELS[cls._level]
+        return {
+            "enabled": Config.get("throttle_enabled"),
+            "level": cls._level,
+            "name": name,
+            "reason": cls._reason,
+            "since": cls._changed_dt,
+            "signals": dict(cls._signals),
+            "actions": actions
+        }
+
+    # ------------------ Evaluation ------------------
+
+    @classmethod
+    def _run(cls):
+        while not cls._stop.is_set():
+            try:
+                cls.evaluate()
+            except Exception as e:
+                Logger.warning(f"Throttle governor sample failed: {e}", category="governor")
+            cls._stop.wait(max(1, Config.get("throttle_sample_seconds")))
+
+    @classmethod
+    def _sample(cls) -> dict:
+        from lib.class_status import Status
+        load = Status.get_cpu_load()
+        with cls._lock:
+            ticks = [list(t) for t in cls._ticks.values() if t]
+        # The camera overrunning most drives the signal
+        return {
+            "temperature": Status.get_temperature(),
+            "load": round(load / (os.cpu_count() or 1), 2) if load is not None else None,
+            "overrun": round(max(sum(t) / len(t) for t in ticks), 2) if ticks else None
+        }
+
+    @classmethod
+    def _thresholds(cls) -> dict:
+        return {
+            "temperature": Config.get("throttle_temp_levels"),
+            "load": Config.get("throttle_load_levels"),
+            "overrun": Config.get("throttle_overrun_levels")
+        }
+
+    @staticmethod
+    def _signal_level(value, thresholds, margin: float = 0.0) -> int:
+        if value is None:
+            return 0
+        return sum(1 for t in thresholds[:3] if value >= t * (1 - margin))
+
+    @classmethod
+    def evaluate(cls, signals: dict = None) -> int:
+        """Sample (or take) the signals and move to the resulting level. Returns the level."""
+        if not Config.get("throttle_enabled"):
+            signals = signals or {}
+            target, reason = 0, "disabled"
+        else:
+            signals = signals or cls._sample()
+            thresholds = cls._thresholds()
+            margin = max(0.0, Config.get("throttle_hysteresis"))
+
+            # Level each signal demands, and the level it still holds with hysteresis
+            raise_to = {k: cls._signal_level(v, thresholds[k]) for k, v in signals.items()}
+            hold_at = {k: cls._signal_level(v, thresholds[k], margin) for k, v in signals.items()}
+
+            up = max(raise_to.values(), default=0)
+            if up > cls._level:
+                target = up
+            else:
+                held = max(hold_at.values(), default=0)
+                hold_time = Config.get("throttle_hold_seconds")
+                target = cls._level
+                if held < cls._level and time.monotonic() - cls._changed_at >= hold_time:
+                    target = cls._level - 1
+            reason = max(raise_to, key=raise_to.get) if max(raise_to.values(), default=0) else None
+
+        cls._signals = {k: signals.get(k) for k in cls._signals}
+        if target != cls._level:
+            cls._set_level(target, reason)
+        return cls._level
+
+    @classmethod
+    def _set_level(cls, level: int, reason: str):
+        previous = cls.LEVELS[cls._level][0]
+        name, actions = cls.LEVELS[level]
+        signals = ", ".join(f"{k}={v}" for k, v in cls._signals.items() if v is not None)
+        message = f"Throttle level {previous} -> {name} ({reason or 'recovered'}; {signals})"
+        if level > cls._level:
+            Logger.warning(message, category="governor")
+        else:
+            Logger.info(message, category="governor")
+
+        cls._level = level
+        cls._reason = reason
+        cls._changed_at = time.monotonic()
+        cls._changed_dt = datetime.now().isoformat()
+
+        from lib.class_status import Status
+        Status.force_emit()
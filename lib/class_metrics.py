@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from lib.class_config import Config
+
+
+class Metrics:
+    """
+    Rolling per-stage latency histograms for the capture hot path.
+    Timing is skipped entirely while disabled, and can be toggled at runtime.
+    """
+    _enabled = None
+    _lock = threading.Lock()
+    _samples = {}
+    _counts = {}
+    _window = 500
+    _buckets_ms = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Use classmethods only — do not instantiate Metrics")
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        if cls._enabled is None:
+            cls._enabled = bool(Config.get("metrics_enabled"))
+        return cls._enabled
+
+    @classmethod
+    def set_enabled(cls, enabled: bool):
+        cls._enabled = bool(enabled)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._samples.clear()
+            cls._counts.clear()
+
+    @classmethod
+    @contextmanager
+    def timer(cls, stage: str):
+        if not cls.is_enabled():
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.record(stage, time.perf_counter() - start)
+
+    @classmethod
+    def record(cls, stage: str, seconds: float):
+        if not cls.is_enabled():
+            return
+        with cls._lock:
+            if stage not in cls._samples:
+                cls._samples[stage] = deque(maxlen=cls._window)
+                cls._counts[stage] = 0
+            cls._samples[stage].append(seconds * 1000)
+            cls._counts[stage] += 1
+
+    @classmethod
+    def _histogram(cls, samples: list) -> dict:
+        hist = {f"<={b}": 0 for b in cls._buckets_ms}
+        hist["inf"] = 0
+        for value in samples:
+            for b in cls._buckets_ms:
+                if value <= b:
+                    hist[f"<={b}"] += 1
+                    break
+            else:
+                hist["inf"] += 1
+        return hist
+
+    @staticmethod
+    def _percentile(samples: list, p: float) -> float:
+        idx = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+        return round(samples[idx], 2)
+
+    @classmethod
+    def summary(cls, histogram: bool = False) -> dict:
+        with cls._lock:
+            stages = {k: (sorted(v), cls._counts[k]) for k, v in cls._samples.items() if v}
+
+        result = {}
+        for stage, (samples, total) in stages.items():
+            entry = {
+                "count": total,
+                "p50_ms": cls._percentile(samples, 50),
+                "p90_ms": cls._percentile(samples, 90),
+                "p99_ms": cls._percentile(samples, 99),
+                "max_ms": round(samples[-1], 2)
+            }
+            if histogram:
+                entry["histogram"] = cls._histogram(samples)
+            result[stage] = entry
+        return result
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return {
+            "enabled": cls.is_enabled(),
+            "window": cls._window,
+            "stages": cls.summary(histogram=True)
+        }
@@ -0,0 +1,197 @@
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+from lib.class_metrics import Metrics
+from lib.class_socket import SocketManager
+from lib.class_write_stager import WriteStager
+
+
+class PostProcessor:
+    """
+    Handles the work that follows a captured frame (latest-frame publishing,
+    session accounting, thumbnails, notifications) on a worker thread, so
+    the capture thread only grabs and writes the frame.
+
+    The worker drains everything queued at once: every frame is counted,
+    but only the newest one is published and announced.
+
+    When the queue is full the overflow policy applies:
+      - "block":  the capture thread waits for space
+      - "inline": the capture thread takes the queued frames and its own
+                  and processes them synchronously
+
+    Jobs are taken off the queue and processed under one lock, so batches
+    are always handled in capture order whichever thread runs them; the
+    sequence number additionally keeps an older frame from replacing a
+    newer one as latest.
+    """
+    POLICIES = ("block", "inline")
+
+    def __init__(self, session, latest_path: Path):
+        self.session = session
+        self.latest_path = latest_path
+        self.policy = Config.get("postprocess_overflow")
+        if self.policy not in self.POLICIES:
+            Logger.warning(f"Unknown post-process overflow policy '{self.policy}', using 'block'", category="camera")
+            self.policy = "block"
+
+        self._jobs = deque()
+        self._size = max(1, Config.get("postprocess_queue_size"))
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._process_lock = threading.Lock()
+        self._seq = 0
+        self._published_seq = 0
+        self._processed = 0
+        self._overflows = 0
+        self._max_depth = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name="capture-postprocess")
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Drain outstanding frames and stop the worker."""
+        if not self._thread:
+            return
+        with self._cond:
+            self._jobs.append(None)
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            Logger.warning("Post-process worker did not drain before timeout", category="camera")
+        self._thread = None
+
+    def submit(self, full_path: Path, size: int = None, score: float = None):
+        self._seq += 1
+        job = (full_path, size, time.monotonic(), score, self._seq)
+        with self._cond:
+            full = len(self._jobs) >= self._size
+            if not full:
+                self._jobs.append(job)
+                self._cond.notify_all()
+                depth = len(self._jobs)
+
+        if full:
+            with self._stats_lock:
+                self._overflows += 1
+            if self.policy == "inline":
+                Logger.warning("Post-process queue full, processing frames inline", category="camera")
+                with self._process_lock:
+                    # Older queued frames go first so the manifest stays in capture order
+                    self._publish(self._take() + [job])
+                return
+            Logger.warning("Post-process queue full, capture thread waiting", category="camera")
+            with self._cond:
+                while len(self._jobs) >= self._size:
+                    self._cond.wait()
+                self._jobs.append(job)
+                self._cond.notify_all()
+                depth = len(self._jobs)
+
+        with self._stats_lock:
+            self._max_depth = max(self._max_depth, depth)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            with self._cond:
+                while not self._jobs:
+                    self._cond.wait()
+
+            # Jobs are only ever taken with the process lock held and handled
+            # before it is released, so batches run in capture order
+            with self._process_lock:
+                jobs = self._take()
+                if None in jobs:
+                    stopping = True
+                    jobs = [j for j in jobs if j is not None]
+
+                if jobs:
+                    try:
+                        self._publish(jobs)
+                    except Exception as e:
+                        Logger.error(f"Post-process error: {e}", category="camera")
+
+    def _take(self) -> list:
+        with self._cond:
+            jobs = list(self._jobs)
+            self._jobs.clear()
+            self._cond.notify_all()
+        return jobs
+
+    def _publish(self, jobs: list):
+        newest_path, newest_seq = jobs[-1][0], jobs[-1][4]
+        newer = newest_seq > self._published_seq
+
+        if newer:
+            self._published_seq = newest_seq
+            with Metrics.timer("latest_publish"):
+                staged = WriteStager.resolve(newest_path)
+                # The flusher may move the frame between resolve and link
+                if not self.publish_latest(staged, self.latest_path) and staged != newest_path:
+                    self.publish_latest(newest_path, self.latest_path)
+
+        with Metrics.timer("session_save"):
+            self.session.add_frames([(path, size, score) for path, size, _, score, _ in jobs])
+
+        if newer:
+            with Metrics.timer("emit"):
+                SocketManager.emit("image-updated", {
+                    "filename": newest_path.name,
+                    "session_id": self.session.session_id(),
+                    "camera": self.session.get("camera", "default")
+                })
+
+        now = time.monotonic()
+        lag = now - jobs[0][2]
+        with self._stats_lock:
+            self._processed += len(jobs)
+            self._last_lag = lag
+            self._max_lag = max(self._max_lag, lag)
+
+    @staticmethod
+    def publish_latest(src: Path, latest_path: Path) -> bool:
+        """
+        Point latest_path at src atomically. A hardlink avoids copying the
+        frame; readers only ever see the old or the new complete file since
+        the swap is a single rename. Falls back to copy + rename when the
+        filesystem cannot hardlink (e.g. FAT or a different device).
+        """
+        tmp = latest_path.with_name(f".{latest_path.name}.tmp")
+        try:
+            tmp.unlink(missing_ok=True)
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copy2(src, tmp)
+            os.replace(tmp, latest_path)
+            return True
+        except Exception as e:
+            Logger.warning(f"Failed to update latest symlink: {e}", category="camera")
+            tmp.unlink(missing_ok=True)
+            return False
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "policy": self.policy,
+                "queue_depth": len(self._jobs),
+                "queue_max_depth": self._max_depth,
+                "queue_size": self._size,
+                "processed": self._processed,
+                "overflows": self._overflows,
+                "lag_ms": round(self._last_lag * 1000, 1),
+                "max_lag_ms": round(self._max_lag * 1000, 1)
+            }
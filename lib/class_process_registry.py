@@ -0,0 +1,176 @@
+import os
+import signal
+import threading
+import subprocess
+from pathlib import Path
+
+import psutil
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+
+
+class ProcessRegistry:
+    """
+    Owns long-running camera subprocesses (streamer, capture pipelines).
+
+    Each process is registered under a name with a pidfile and an exit
+    watcher, so mode queries are a dict lookup instead of a process scan.
+    A full process scan only runs once, in recover(), at startup.
+    """
+    _procs = {}
+    _lock = threading.Lock()
+    _run_dir = Path(Config.config_path("run/.keep")).parent
+
+    # Command line markers used to recognise processes we started
+    _markers = {
+        "streamer": [["mjpg_streamer"], ["libcamera-vid", "streamer_relay.py"]],
+        "capture": [["libcamera-vid", "--codec", "mjpeg", "--nopreview"], ["ffmpeg", "-f", "mjpeg", "-"]]
+    }
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Use classmethods only — do not instantiate ProcessRegistry")
+
+    # ------------------ Public ------------------
+
+    @classmethod
+    def spawn(cls, name: str, cmd: list, **kwargs) -> subprocess.Popen:
+        """Start cmd in its own process group and register it under name."""
+        proc = subprocess.Popen(cmd, start_new_session=True, **kwargs)
+        cls.register(name, proc.pid, proc)
+        return proc
+
+    @classmethod
+    def register(cls, name: str, pid: int, proc: subprocess.Popen = None):
+        with cls._lock:
+            cls._procs[name] = {"pid": pid, "proc": proc}
+        cls._write_pidfile(name, pid)
+        threading.Thread(target=cls._watch, args=(name, pid, proc), daemon=True, name=f"proc-watch-{name}").start()
+        Logger.debug(f"Registered process '{name}' (pid {pid})", category="process")
+
+    @classmethod
+    def is_alive(cls, name: str) -> bool:
+        return name in cls._procs
+
+    @classmethod
+    def get(cls, name: str) -> subprocess.Popen:
+        entry = cls._procs.get(name)
+        return entry["proc"] if entry else None
+
+    @classmethod
+    def pid(cls, name: str) -> int:
+        entry = cls._procs.get(name)
+        return entry["pid"] if entry else None
+
+    @classmethod
+    def terminate(cls, name: str, timeout: float = 3) -> bool:
+        """Terminate the named process group. Returns False if nothing was registered."""
+        entry = cls._procs.get(name)
+        if not entry:
+            return False
+
+        pid = entry["pid"]
+        cls._signal(pid, signal.SIGTERM)
+
+        try:
+            if entry["proc"] is not None:
+                entry["proc"].wait(timeout=timeout)
+            else:
+                psutil.Process(pid).wait(timeout=timeout)
+        except psutil.NoSuchProcess:
+            pass
+        except (psutil.TimeoutExpired, subprocess.TimeoutExpired):
+            Logger.warning(f"Process '{name}' did not exit, killing", category="process")
+            cls._signal(pid, signal.SIGKILL)
+
+        cls._forget(name, pid)
+        return True
+
+    @classmethod
+    def list(cls) -> dict:
+        with cls._lock:
+            return {name: entry["pid"] for name, entry in cls._procs.items()}
+
+    @classmethod
+    def recover(cls):
+        """
+        One-time startup recovery: adopt processes from pidfiles, then scan
+        once for untracked camera processes left from a previous run.
+        """
+        for pidfile in cls._run_dir.glob("*.pid"):
+            name = pidfile.stem
+            try:
+                pid = int(pidfile.read_text().strip())
+                if cls._matches(name, psutil.Process(pid)):
+                    cls.register(name, pid)
+                    Logger.info(f"Recovered process '{name}' (pid {pid}) from pidfile", category="process")
+                    continue
+            except (ValueError, psutil.Error):
+                pass
+            pidfile.unlink(missing_ok=True)
+
+        for proc in psutil.process_iter(["pid", "cmdline"]):
+            for name in cls._markers:
+                if cls.is_alive(name) or proc.pid in cls.list().values() or not cls._matches(name, proc):
+                    continue
+                cls.register(name, proc.pid)
+                Logger.warning(f"Adopted untracked '{name}' process (pid {proc.pid})", category="process")
+
+    # ------------------ Internal ------------------
+
+    @classmethod
+    def _matches(cls, name: str, proc: psutil.Process) -> bool:
+        try:
+            cmd = " ".join(proc.cmdline() or [])
+        except psutil.Error:
+            return False
+        # Per-camera pipelines are registered as e.g. "capture-garden"
+        kind = name.partition("-")[0]
+        return any(all(m in cmd for m in markers) for markers in cls._markers.get(kind, []))
+
+    @classmethod
+    def _watch(cls, name: str, pid: int, proc: subprocess.Popen):
+        try:
+            if proc is not None:
+                code = proc.wait()
+            else:
+                code = psutil.Process(pid).wait()
+        except psutil.NoSuchProcess:
+            code = None
+        except Exception as e:
+            Logger.warning(f"Exit watcher for '{name}' failed: {e}", category="process")
+            code = None
+
+        if cls._forget(name, pid):
+            Logger.info(f"Process '{name}' (pid {pid}) exited with code {code}", category="process")
+            from lib.class_status import Status
+            Status.force_emit()
+
+    @classmethod
+    def _forget(cls, name: str, pid: int) -> bool:
+        with cls._lock:
+            entry = cls._procs.get(name)
+            if not entry or entry["pid"] != pid:
+                return False
+            del cls._procs[name]
+        (cls._run_dir / f"{name}.pid").unlink(missing_ok=True)
+        return True
+
+    @classmethod
+    def _write_pidfile(cls, name: str, pid: int):
+        try:
+            (cls._run_dir / f"{name}.pid").write_text(str(pid))
+        except Exception as e:
+            Logger.warning(f"Failed to write pidfile for '{name}': {e}", category="process")
+
+    @staticmethod
+    def _signal(pid: int, sig):
+        """Signal the process group of pid (whole pipelines), or just pid if it shares ours."""
+        try:
+            pgid = os.getpgid(pid)
+            if pgid != os.getpgid(0):
+                os.killpg(pgid, sig)
+            else:
+                os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
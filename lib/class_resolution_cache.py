@@ -0,0 +1,267 @@
+import os
+import re
+import json
+import time
+import threading
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+
+
+class ResolutionCache:
+    """
+    Camera resolution/mode cache. Probing (v4l2-ctl / libcamera-hello) runs
+    in the background at startup, on device change or on explicit refresh,
+    and is persisted to the config directory so requests never block on it.
+    """
+    _cache_file = Path(Config.config_path("resolutions.json"))
+    _cache = None
+    _lock = threading.Lock()
+    _probe_thread = None
+    _retry_delay = 30  # seconds to wait while the camera is busy
+
+    # libcamera-hello --list-cameras mode line, e.g.
+    # 'SRGGB10_CSI2P' : 1536x864 [120.13 fps - (768, 432)/3072x1728 crop]
+    _libcamera_mode = re.compile(
+        r"(?:'(?P<format>\w+)'\s*:\s*)?(?P<w>\d{3,5})x(?P<h>\d{3,5})\s*\[(?P<fps>[\d.]+) fps - "
+        r"\((?P<cx>\d+), (?P<cy>\d+)\)/(?P<cw>\d+)x(?P<ch>\d+) crop\]"
+    )
+    _libcamera_known = ["1280x720", "640x360", "320x180", "1024x768"]
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Use classmethods only — do not instantiate ResolutionCache")
+
+    # ------------------ Public ------------------
+
+    @classmethod
+    def start(cls):
+        """Load the persisted cache and probe in the background if it is missing or stale."""
+        cls._load()
+        if not cls._is_current():
+            cls.refresh()
+
+    @classmethod
+    def get(cls, aspect_ratio: str = None) -> list:
+        if cls._cache is None:
+            cls._load()
+        if not cls._is_current():
+            cls.refresh()
+
+        with cls._lock:
+            modes = list(cls._cache.get("modes", [])) if cls._cache else []
+
+        if aspect_ratio:
+            modes = [m for m in modes if m["aspect_ratio"].lower() == aspect_ratio.lower()]
+        return modes
+
+    @classmethod
+    def info(cls) -> dict:
+        with cls._lock:
+            cache = cls._cache or {}
+            return {
+                "device_key": cache.get("device_key"),
+                "probed_at": cache.get("probed_at"),
+                "failed": cache.get("failed", False),
+                "count": len(cache.get("modes", [])),
+                "probing": cls.is_probing()
+            }
+
+    @classmethod
+    def is_probing(cls) -> bool:
+        return bool(cls._probe_thread and cls._probe_thread.is_alive())
+
+    @classmethod
+    def refresh(cls):
+        """Start a background probe unless one is already running."""
+        with cls._lock:
+            if cls.is_probing():
+                return
+            cls._probe_thread = threading.Thread(target=cls._probe_loop, daemon=True, name="resolution-probe")
+            cls._probe_thread.start()
+
+    # ------------------ Device tracking ------------------
+
+    @staticmethod
+    def _device_key() -> str:
+        camera_type = Config.get("camera_type")
+        if camera_type == "synthetic":
+            return "synthetic"
+        device = Config.get("video_device", "/dev/video0")
+        if camera_type.startswith("libcamera"):
+            device = "/dev/media0"
+        return f"{camera_type}|{device}|{ResolutionCache._sysfs_identity(device)}"
+
+    @staticmethod
+    def _sysfs_identity(device: str) -> str:
+        """
+        driver:model:bus path of a device from sysfs. Unlike the /dev node,
+        which is recreated on every boot, this only changes when a
+        different camera is attached or it moves to another port.
+        """
+        if not os.path.exists(device):
+            return "missing"
+        name = Path(device).name
+        sys_dir = next(
+            (d for d in (Path("/sys/class/video4linux") / name, Path("/sys/class/media") / name) if d.exists()),
+            None
+        )
+        if sys_dir is None:
+            return "unknown"
+
+        def read(path: Path) -> str:
+            try:
+                return path.read_text().strip()
+            except OSError:
+                return ""
+
+        parent = sys_dir / "device"
+        bus = os.path.realpath(parent).removeprefix("/sys/devices/") if parent.exists() else ""
+        driver = Path(os.path.realpath(parent / "driver")).name if (parent / "driver").exists() else ""
+        model = read(sys_dir / "name") or read(sys_dir / "model")
+        return f"{driver}:{model}:{bus}"
+
+    @classmethod
+    def _is_current(cls) -> bool:
+        return bool(cls._cache) and cls._cache.get("device_key") == cls._device_key()
+
+    # ------------------ Probing ------------------
+
+    @classmethod
+    def _probe_loop(cls):
+        from lib.class_camera import Camera
+        camera = Camera.get_instance()
+
+        while camera.is_running() or camera.is_streaming():
+            Logger.debug("Camera busy, deferring resolution probe", category="camera")
+            time.sleep(cls._retry_delay)
+
+        key = cls._device_key()
+        camera_type = Config.get("camera_type")
+        if camera_type == "synthetic":
+            modes = cls._synthetic_modes()
+        elif camera_type.startswith("libcamera"):
+            modes = cls._probe_libcamera()
+        else:
+            modes = cls._probe_v4l2()
+
+        failed = modes is None
+        if failed:
+            # Keep the last known modes; the failure is remembered for this
+            # device so every request does not launch a new probe
+            modes = (cls._cache or {}).get("modes", [])
+
+        cache = {
+            "device_key": key,
+            "probed_at": datetime.now().isoformat(),
+            "failed": failed,
+            "modes": sorted(modes, key=lambda m: tuple(map(int, m["resolution"].split("x"))))
+        }
+        with cls._lock:
+            cls._cache = cache
+        cls._save()
+        Logger.info(f"Resolution cache refreshed: {len(modes)} modes", category="camera")
+
+    @staticmethod
+    def _mode(resolution, max_fps=None, binning=None, crop=None, fmt=None) -> dict:
+        from lib.class_camera import Camera
+        return {
+            "resolution": resolution,
+            "aspect_ratio": Camera._aspect_ratio(resolution),
+            "max_fps": max_fps,
+            "binning": binning,
+            "crop": crop,
+            "format": fmt
+        }
+
+    @classmethod
+    def _probe_v4l2(cls) -> list:
+        try:
+            output = subprocess.check_output([
+                "v4l2-ctl", "--list-formats-ext",
+                "-d", Config.get("video_device", "/dev/video0")
+            ], text=True, timeout=15)
+        except Exception as e:
+            Logger.error(f"Error listing resolutions: {e}", category="camera")
+            return None
+
+        modes = {}
+        fmt = current = None
+        for line in output.splitlines():
+            line = line.strip()
+            match = re.match(r"\[\d+\]: '(\w+)'", line)
+            if match:
+                fmt = match.group(1)
+            elif line.startswith("Size: Discrete"):
+                current = line.split()[2]
+                modes.setdefault(current, cls._mode(current, fmt=fmt))
+            elif line.startswith("Interval:") and current:
+                fps = re.search(r"\(([\d.]+) fps\)", line)
+                if fps:
+                    mode = modes[current]
+                    mode["max_fps"] = max(mode["max_fps"] or 0, float(fps.group(1)))
+
+        return list(modes.values())
+
+    @classmethod
+    def _probe_libcamera(cls) -> list:
+        try:
+            output = subprocess.check_output(["libcamera-hello", "--list-cameras"], text=True, timeout=15)
+        except Exception as e:
+            Logger.warning(f"Failed to list libcamera resolutions: {e}", category="camera")
+            return None
+
+        modes = {}
+        fmt = None
+        for line in output.splitlines():
+            match = cls._libcamera_mode.search(line)
+            if not match:
+                continue
+            fmt = match.group("format") or fmt
+            w, h = int(match.group("w")), int(match.group("h"))
+            cw, ch = int(match.group("cw")), int(match.group("ch"))
+            res = f"{w}x{h}"
+            fps = float(match.group("fps"))
+            if res in modes and (modes[res]["max_fps"] or 0) >= fps:
+                continue
+            modes[res] = cls._mode(
+                res,
+                max_fps=fps,
+                binning=f"{round(cw / w)}x{round(ch / h)}",
+                crop=[int(match.group("cx")), int(match.group("cy")), cw, ch],
+                fmt=fmt
+            )
+
+        for res in cls._libcamera_known:
+            modes.setdefault(res, cls._mode(res))
+        return list(modes.values())
+
+    @classmethod
+    def _synthetic_modes(cls) -> list:
+        return [cls._mode(res) for res in ["320x240", "640x480", "1280x720", "1600x1200", "1920x1080"]]
+
+    # ------------------ Persistence ------------------
+
+    @classmethod
+    def _load(cls):
+        if not cls._cache_file.exists():
+            cls._cache = {}
+            return
+        try:
+            with cls._cache_file.open("r") as f:
+                cls._cache = json.load(f)
+        except Exception as e:
+            Logger.warning(f"Failed to load resolution cache: {e}", category="camera")
+            cls._cache = {}
+
+    @classmethod
+    def _save(cls):
+        try:
+            tmp = cls._cache_file.with_suffix(".tmp")
+            with tmp.open("w") as f:
+                json.dump(cls._cache, f, indent=2)
+            os.replace(tmp, cls._cache_file)
+        except Exception as e:
+            Logger.warning(f"Failed to save resolution cache: {e}", category="camera")
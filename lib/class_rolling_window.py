@@ -0,0 +1,88 @@
+import time
+import threading
+from collections import deque
+from pathlib import Path
+
+from lib.class_logging import Logger
+
+
+class RollingWindow:
+    """
+    Keeps a session to the most recent window of frames.
+
+    Frames are appended in capture order, so the oldest frame is always at
+    the left of the deque: eviction is a popleft + unlink, and the frame
+    count and byte total are adjusted incrementally. The directory is never
+    listed or rescanned.
+    """
+
+    def __init__(self, max_age: float = 0, max_frames: int = 0, remove=None):
+        self.max_age = max(0.0, float(max_age or 0))
+        self.max_frames = max(0, int(max_frames or 0))
+        self._remove = remove or self._unlink
+        self._frames = deque()  # (captured_at epoch, path, size)
+        self._bytes = 0
+        self._evicted = 0
+        self._evicted_bytes = 0
+        self._lock = threading.Lock()
+
+    def is_enabled(self) -> bool:
+        return bool(self.max_age or self.max_frames)
+
+    def add(self, path: Path, size: int, captured_at: float = None) -> tuple:
+        """
+        Append a frame and evict whatever has fallen out of the window.
+        Returns (evicted_count, evicted_bytes) for this call.
+        """
+        now = time.time() if captured_at is None else captured_at
+        with self._lock:
+            self._frames.append((now, path, size))
+            self._bytes += size
+            return self._evict(now)
+
+    def _evict(self, now: float) -> tuple:
+        count = freed = 0
+        cutoff = now - self.max_age if self.max_age else None
+
+        while self._frames and (
+            (self.max_frames and len(self._frames) > self.max_frames) or
+            (cutoff is not None and self._frames[0][0] < cutoff)
+        ):
+            _, path, size = self._frames.popleft()
+            try:
+                self._remove(path)
+            except OSError as e:
+                Logger.warning(f"Failed to evict {path.name}: {e}", category="session")
+            self._bytes -= size
+            count += 1
+            freed += size
+
+        self._evicted += count
+        self._evicted_bytes += freed
+        return count, freed
+
+    @staticmethod
+    def _unlink(path: Path):
+        path.unlink(missing_ok=True)
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def oldest(self) -> Path:
+        with self._lock:
+            return self._frames[0][1] if self._frames else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_age": self.max_age,
+                "max_frames": self.max_frames,
+                "frames": len(self._frames),
+                "bytes": self._bytes,
+                "evicted": self._evicted,
+                "evicted_bytes": self._evicted_bytes
+            }
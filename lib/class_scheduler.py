@@ -0,0 +1,114 @@
+import math
+import time
+import threading
+from collections import deque
+
+from lib.class_logging import Logger
+
+
+class CaptureScheduler:
+    """
+    Deadline-based tick scheduler for the capture loop.
+
+    Ticks target absolute times on the monotonic clock (start + n * interval),
+    so an overrun on one frame does not shift the ones after it and wall-clock
+    (NTP) jumps have no effect. Missed ticks are either skipped, keeping the
+    original cadence, or caught up by running them back-to-back.
+    """
+    POLICIES = ("skip", "catchup")
+
+    def __init__(self, interval: float, policy: str = "skip", history: int = 500):
+        if policy not in self.POLICIES:
+            Logger.warning(f"Unknown missed tick policy '{policy}', using 'skip'", category="camera")
+            policy = "skip"
+        self.interval = float(interval)
+        self.stretch = 1.0
+        self.policy = policy
+        self.missed = 0
+        self.ticks = 0
+        self._deadline = None
+        self._jitter = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def start(self, offset: float = 0.0):
+        """Start the tick sequence, optionally phase-shifted by offset seconds."""
+        self._wake.clear()
+        self._deadline = time.monotonic() + max(0.0, offset)
+        if offset > 0:
+            self._wake.wait(offset)
+
+    def begin_tick(self) -> float:
+        """Record how late this tick started against its target. Returns the jitter in seconds."""
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        jitter = now - self._deadline
+        with self._lock:
+            self._jitter.append(jitter)
+            self.ticks += 1
+        return jitter
+
+    def wait_next(self) -> float:
+        """Advance to the next deadline and sleep until it. Returns the time slept."""
+        period = self.period
+        self._deadline += period
+        now = time.monotonic()
+
+        if now > self._deadline:
+            behind = math.ceil((now - self._deadline) / period)
+            if self.policy == "skip":
+                self._deadline += behind * period
+                with self._lock:
+                    self.missed += behind
+                Logger.warning(f"Capture loop fell behind, skipped {behind} tick(s)", category="camera")
+            else:
+                Logger.debug(f"Capture loop {behind} tick(s) behind, catching up", category="camera")
+                return 0.0
+
+        sleep_time = self._deadline - now
+        if sleep_time > 0:
+            self._wake.wait(sleep_time)
+        return max(sleep_time, 0.0)
+
+    @property
+    def period(self) -> float:
+        """Effective tick period: the interval times any throttle stretch."""
+        return self.interval * self.stretch
+
+    def set_interval(self, interval: float):
+        """Change the cadence; takes effect from the next deadline."""
+        self.interval = float(interval)
+
+    def set_stretch(self, factor: float):
+        """Slow the cadence by factor without touching the configured interval."""
+        self.stretch = max(1.0, float(factor))
+
+    def wake(self):
+        """Interrupt a pending sleep, e.g. when capture is stopped."""
+        self._wake.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = sorted(self._jitter)
+            missed, ticks = self.missed, self.ticks
+
+        def pct(p):
+            if not samples:
+                return None
+            idx = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+            return round(samples[idx] * 1000, 1)
+
+        return {
+            "interval": self.interval,
+            "stretch": self.stretch,
+            "policy": self.policy,
+            "ticks": ticks,
+            "missed": missed,
+            "jitter_ms": {
+                "p50": pct(50),
+                "p90": pct(90),
+                "p99": pct(99),
+                "max": round(samples[-1] * 1000, 1) if samples else None
+            }
+        }
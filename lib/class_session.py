@@ -1,5 +1,3 @@
-import os
-import json
 import shutil
 from datetime import datetime
 from pathlib import Path
@@ -10,10 +8,17 @@ import threading
 from lib.class_config import Config
 from lib.class_logging import Logger
 from lib.class_socket import SocketManager
+from lib.class_rolling_window import RollingWindow
+from lib.class_write_stager import WriteStager
+from lib.class_session_store import SessionStore
+from lib.class_counter_journal import CounterJournal
+from lib.class_frame_manifest import FrameManifest
+from lib.class_time_index import TimeIndex
 
 class Session:
-    _sessions_cache = None
-    _session_file = Config.config_path("sessions.json")
+    # Handles are created per lookup (status loop, socket debounce, routes)
+    __slots__ = ("session", "window", "_dirty", "_manifest")
+
     _capture_dir  = Config.get("storage_path")
     _download_dir = Config.get("download_path")
     _remove_buffer = {}
@@ -21,9 +26,30 @@ class Session:
     _emit_lock = threading.Lock()
     _emit_delay = 0.2  # seconds
 
-    def __init__(self, session_id=None):
+    # Counters updated per frame: kept in memory, journaled, checkpointed on a timer
+    HOT_FIELDS = ("file_count", "size_bytes", "last_frame_at", "rolling_window")
+    _live = {}
+    _live_lock = threading.Lock()
+    _checkpoint_thread = None
+    _checkpoint_stop = threading.Event()
+    # add_burst (capture thread) and rolling-window eviction (post-process thread)
+    _bursts_lock = threading.Lock()
+    # Cameras started together must not be handed the same session ID
+    _id_lock = threading.Lock()
+
+    def __init__(self, session_id=None, camera: str = None, interval: float = None, resolution: str = None):
+        self.window = None
+        self._dirty = False
+        self._manifest = None
         if session_id is None:
-            self.session = self._start_new_session()
+            self.session = self._start_new_session(camera, interval, resolution)
+            window = RollingWindow(
+                Config.get("rolling_window_hours") * 3600,
+                Config.get("rolling_window_frames"),
+                remove=self._evict_frame
+            )
+            if window.is_enabled():
+                self.window = window
         else:
             self.session = self._get_by_id(session_id)
             if self.session is None:
@@ -59,11 +85,11 @@ class Session:
             target_width = round(original_width / original_height * target_height)
 
             if not image_path:
-                jpgs = sorted((Config.get("storage_path") / self.session_id()).glob("*.jpg"))
-                if not jpgs:
+                first = self.manifest().first()
+                if not first:
                     Logger.warning("No images found to generate thumbnail", category="session")
                     return
-                image_path = jpgs[0]
+                image_path = WriteStager.resolve(self.manifest().folder / first[1])
 
             Logger.debug(f"Generating thumbnail {target_width}x{target_height} from {image_path}", category="session")
 
@@ -86,41 +112,92 @@ class Session:
     def get_thumbnail_path(self) -> Path:
         return Config.get("storage_path") / self.session_id() / "thumbnail.jpg"
 
-
-    def _start_new_session(self):
+    def manifest(self) -> FrameManifest:
+        if self._manifest is None:
+            self._manifest = FrameManifest(Config.get("storage_path") / self.session_id())
+        return self._manifest
+
+    def _evict_frame(self, path: Path):
+        WriteStager.discard(path)
+        self.manifest().remove(path.name)
+
+    def _evict_bursts(self, oldest: str):
+        """
+        Rolling mode: burst sub-folders are not part of the frame window, so a
+        burst is deleted as a whole once it ended before the oldest frame kept.
+        """
+        with self._bursts_lock:
+            bursts = self.session.get("bursts", [])
+            expired = [b for b in bursts if (b.get("ended_at") or "") < oldest]
+            if not expired:
+                return
+            self.session["bursts"] = [b for b in bursts if b not in expired]
+            self.save(["bursts"])
+
+        # Frames of the burst may still be staged
+        WriteStager.flush()
+        folder = Config.get("storage_path") / self.session_id()
+        for burst in expired:
+            shutil.rmtree(folder / burst["folder"], ignore_errors=True)
+        Logger.info(
+            f"Rolling window evicted {len(expired)} burst(s) ({sum(b.get('frames', 0) for b in expired)} frames)",
+            category="session"
+        )
+
+
+    def _start_new_session(self, camera: str = None, interval: float = None, resolution: str = None):
+        """Interval and resolution are the capturing camera's effective ones; the globals otherwise."""
         now = datetime.now()
-        session_id = now.strftime("%Y%m%d-%H%M")
-
         session = {
-            "session_id": session_id,
+            "session_id": None,
+            "camera": camera or "default",
             "status": "active",
             "started_at": now.isoformat(),
             "ended_at": None,
-            "interval": Config.get("interval"),
-            "resolution": Config.get("resolution"),
+            "interval": Config.get("interval") if interval is None else interval,
+            "resolution": resolution or Config.get("resolution"),
             "file_count": 0,
+            "size_bytes": 0,
+            "last_frame_at": None,
+            "rolling_window": {
+                "hours": Config.get("rolling_window_hours"),
+                "frames": Config.get("rolling_window_frames"),
+                "evicted": 0
+            },
+            "schedule_history": [],
+            "exposure": None,
+            "exposure_locks": [],
+            "bursts": [],
             "tags": [],
             "notes": "",
             "zip_file": None,
             "zip_size": None
         }
 
-        self._get_sessions().append(session)
-        self._save_sessions()
+        with Session._id_lock:
+            session_id = base_id = now.strftime("%Y%m%d-%H%M")
+            suffix = 1
+            while self.session_exists(session_id):
+                suffix += 1
+                session_id = f"{base_id}-{suffix}"
+            session["session_id"] = session_id
+
+            # An empty manifest from the start, so nothing rebuilds it from a folder still being written
+            folder = Config.get("storage_path") / session_id
+            folder.mkdir(parents=True, exist_ok=True)
+            FrameManifest(folder).path.touch()
+
+            SessionStore.insert(session)
         SocketManager.emit("add-session", session)
         Logger.info(f"Started new session: {session_id}", category="session")
         return session
 
-    def save(self):
-        """Persist changes to this session in sessions.json."""
-        sessions = self._get_sessions()
-        for i, s in enumerate(sessions):
-            if s.get("session_id") == self.session_id():
-                sessions[i] = self.session
-                break
+    def save(self, fields: list = None):
+        """Persist the given fields of this session, or the whole session when None."""
+        if fields is None:
+            SessionStore.replace(self.session)
         else:
-            sessions.append(self.session)
-        self._save_sessions()
+            SessionStore.update(self.session_id(), {k: self.session.get(k) for k in fields})
 
     def delete(self):
         """Delete session and its associated capture folder and zip."""
@@ -134,13 +211,11 @@ class Session:
             except Exception as e:
                 Logger.error(f"Error deleting capture directory for session {session_id}: {e}", category="session")
 
-        Session._sessions_cache = [
-            s for s in self._get_sessions() if s.get("session_id") != session_id
-        ]
-        self._save_sessions()
-        
+        SessionStore.delete(session_id)
+        TimeIndex.remove(session_id)
+        FrameManifest.forget(capture_dir)
+
         Logger.info(f"Deleted session: {session_id}", category="session")
-        Session._sessions_cache = self._load_sessions()
         self.emit_remove()
         return True
 
@@ -167,21 +242,132 @@ class Session:
         """Mark session as ended and update timestamp."""
         if self.get("status") == "idle":
             return
-        
+
+        # The capturing instance holds the newest counters, which may not be this one
+        with Session._live_lock:
+            live = Session._live.pop(self.session_id(), None)
+        if live is not None:
+            live.checkpoint()
+        owner = live or self
+        if owner._manifest is not None:
+            owner._manifest.close()
+            owner._manifest.compact()
+        CounterJournal.remove(self.session_id())
+        TimeIndex.close(self.session_id())
+
         self.update({
             "ended_at": self._get_end_dt(),
             "status": "idle"
         })
         Logger.info(f"Session {self.session_id()} marked as ended.", category="session")
 
-    def increment_file_count(self):
-        """Increment file counter and save."""
-        self.session["file_count"] = self.session.get("file_count", 0) + 1
-        self.save()
-        if self.session["file_count"] == 1:
-            self.save_thumbnail()
+    def add_frames(self, frames: list):
+        """
+        Account for newly written (path, size, change score) frames and
+        append them to the frame manifest; a size of None is read from the
+        file and the score may be None. Frames whose name carries no capture
+        timestamp are skipped. In rolling mode the oldest frames beyond the
+        window are deleted and subtracted here, so file_count and
+        size_bytes stay correct without listing the folder.
+
+        The counters are only journaled here; checkpoint() writes them to
+        the store every session_checkpoint_seconds and when the session ends.
+        """
+        from lib.class_camera import Camera
+
+        previous = self.session.get("file_count", 0)
+        size = evicted = freed = 0
+        listed = []
+
+        for path, frame_size, score in frames:
+            # The manifest and time index are ordered by the timestamp in the name
+            captured_at = Camera.timestamp_from_name(path.name)
+            if captured_at is None:
+                continue
+            if frame_size is None:
+                try:
+                    frame_size = WriteStager.resolve(path).stat().st_size
+                except OSError:
+                    continue
+            size += frame_size
+            listed.append((path, frame_size, captured_at, score))
+        listed.sort(key=lambda frame: frame[2])
+
+        count = len(listed)
+        if not count:
+            return
+        TimeIndex.extend(
+            self.session_id(), self.get("camera", "default"),
+            listed[0][2].isoformat(), listed[-1][2].isoformat(), count
+        )
+
+        if self.window is None:
+            self.manifest().append(listed)
+        else:
+            for frame in listed:
+                # Listed first so a frame evicted straight away is tombstoned after its entry
+                self.manifest().append([frame])
+                e, f = self.window.add(frame[0], frame[1])
+                evicted += e
+                freed += f
+            if evicted:
+                oldest = self.window.oldest()
+                first = Camera.timestamp_from_name(oldest.name, warn=False) if oldest else None
+                TimeIndex.trim(self.session_id(), first.isoformat() if first else None, evicted)
+                if first:
+                    self._evict_bursts(first.isoformat())
+
+        self.session["file_count"] = previous + count - evicted
+        self.session["size_bytes"] = self.session.get("size_bytes", 0) + size - freed
+        if evicted:
+            self.session["rolling_window"]["evicted"] += evicted
+        self.session["last_frame_at"] = listed[-1][2].isoformat()
+        self._journal()
+        if previous == 0:
+            self.save_thumbnail(WriteStager.resolve(listed[0][0]))
+        self.emit_update()
+
+
+    def _journal(self):
+        session_id = self.session_id()
+        CounterJournal.append(session_id, {k: self.session.get(k) for k in self.HOT_FIELDS})
+        self._dirty = True
+        with Session._live_lock:
+            Session._live[session_id] = self
+        Session._start_checkpointer()
+
+    def checkpoint(self):
+        """Write the in-memory counters to the store and empty the journal."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        self.save(list(self.HOT_FIELDS))
+        CounterJournal.truncate(self.session_id())
+
+    def record_interval(self, interval, reason: str = None):
+        """Append an interval change so exports can reconstruct the real cadence."""
+        history = self.session.setdefault("schedule_history", [])
+        history.append({
+            "at": datetime.now().isoformat(),
+            "interval": interval,
+            "reason": reason
+        })
+        self.save(["schedule_history"])
+        self.emit_update()
+
+    def record_exposure(self, values: dict, reason: str = None):
+        """Record locked exposure/focus values; "exposure" holds the ones currently in use."""
+        self.session["exposure"] = values
+        self.session.setdefault("exposure_locks", []).append({**values, "reason": reason})
+        self.save(["exposure", "exposure_locks"])
         self.emit_update()
 
+    def add_burst(self, burst: dict):
+        """Record a burst sub-sequence written under this session's folder."""
+        with self._bursts_lock:
+            self.session["bursts"] = self.session.get("bursts", []) + [burst]
+            self.save(["bursts"])
+        self.emit_update()
 
     def update_tags(self, tags, add=True):
         """Add or remove tags from session."""
@@ -196,11 +382,11 @@ class Session:
             tag_list = [t for t in tag_list if t not in tags]
 
         self.session["tags"] = tag_list
-        self.save()
+        self.save(["tags"])
 
     def update_notes(self, notes):
         self.session["notes"] = notes
-        self.save()
+        self.save(["notes"])
 
 
     def update(self, key, value=None):
@@ -209,12 +395,14 @@ class Session:
                 if k not in self.session:
                     return False
             self.session.update(key)
+            fields = list(key)
         else:
             if key not in self.session:
                 return False
             self.session[key] = value
-            
-        self.save()
+            fields = [key]
+
+        self.save(fields)
         # Debounced emit
         self.emit_update()
 
@@ -232,7 +420,7 @@ class Session:
     
 
     def refresh(self):
-        """Reload session from file."""
+        """Reload session from the store."""
         updated = self._get_by_id(self.session_id())
         if updated:
             self.session = updated
@@ -245,67 +433,48 @@ class Session:
         if (ended):
             return ended
 
-        session_folder = Config.get("storage_path") / self.session_id()
-        jpgs = sorted(session_folder.glob("*.jpg"))
-        
-        if jpgs:
-            filename = jpgs[-1].stem  # Remove .jpg
-            try:
-                dt = datetime.strptime(filename, "%Y%m%d-%H%M%S")
-                return dt.isoformat()
-            except ValueError:
-                Logger.warning(f"Could not parse timestamp from {filename}", category="session")
-        
-        return datetime.now().isoformat()
+        last = self.manifest().last()
+        return last[0] if last else datetime.now().isoformat()
 
     # ------------------ Class Helpers ------------------
 
     @classmethod
     def list_all(cls, filters: dict = None):
         """Return all sessions, optionally filtered by dict."""
-        results = cls._get_sessions()
-        if filters:
-            for key, val in filters.items():
-                results = [s for s in results if s.get(key) == val]
+        filters = dict(filters or {})
+        indexed = {k: filters.pop(k) for k in list(filters) if k in SessionStore.COLUMNS}
+        results = [cls._with_live_counters(s) for s in SessionStore.all(**indexed)]
+        for key, val in filters.items():
+            results = [s for s in results if s.get(key) == val]
         return results
 
     @classmethod
-    def get_active_session(cls):
-        """Return the first active session or None."""
-        s = next((s for s in cls._get_sessions() if s.get("status") == "active"), None)
+    def get_active_session(cls, camera: str = None):
+        """Return the first active session (of a camera, if given) or None."""
+        filters = {"status": "active"} if camera is None else {"status": "active", "camera": camera}
+        s = SessionStore.first(**filters)
         return Session(s["session_id"]) if s else None
 
     @classmethod
     def session_exists(cls, session_id):
         """Return True if a session with the given ID exists."""
-        return any(s.get("session_id") == session_id for s in cls._get_sessions())
+        return SessionStore.exists(session_id)
 
     @classmethod
     def count(cls, status=None):
         """Return count of sessions, optionally filtered by status."""
-        if status:
-            return sum(1 for s in cls._get_sessions() if s.get("status") == status)
-        return len(cls._get_sessions())
+        return SessionStore.count(status=status) if status else SessionStore.count()
 
     @staticmethod
     def clean_invalid_sessions():
-        """Remove sessions with missing capture folders from the session file."""
-        if not os.path.exists(Session._session_file):
-            return 0
-
-        with open(Session._session_file, "r") as f:
-            sessions = json.load(f)
-
-        valid_sessions = [
-            s for s in sessions if (Session._capture_dir / s["session_id"]).exists()
-        ]
-
-        removed = len(sessions) - len(valid_sessions)
-        if removed:
-            with open(Session._session_file, "w") as f:
-                json.dump(valid_sessions, f, indent=2)
-            Session._sessions_cache = valid_sessions
-        return removed
+        """Remove sessions with missing capture folders from the store."""
+        invalid = [sid for sid in SessionStore.ids() if not (Session._capture_dir / sid).exists()]
+        if invalid:
+            SessionStore.delete(*invalid)
+            TimeIndex.remove(*invalid)
+            for sid in invalid:
+                FrameManifest.forget(Session._capture_dir / sid)
+        return len(invalid)
 
 
     @classmethod
@@ -324,6 +493,79 @@ class Session:
             Logger.info(f"Ended {count} orphaned sessions on boot", category="session")
 
 
+    @classmethod
+    def checkpoint_all(cls):
+        with cls._live_lock:
+            live = list(cls._live.values())
+        for session in live:
+            try:
+                session.checkpoint()
+            except Exception as e:
+                Logger.error(f"Failed to checkpoint session {session.session_id()}: {e}", category="session")
+
+    @classmethod
+    def stop_checkpointer(cls):
+        """Stop the checkpoint timer and write out whatever is still in memory."""
+        cls._checkpoint_stop.set()
+        if cls._checkpoint_thread:
+            cls._checkpoint_thread.join(timeout=5)
+            cls._checkpoint_thread = None
+        cls.checkpoint_all()
+
+    @classmethod
+    def _start_checkpointer(cls):
+        if cls._checkpoint_thread and cls._checkpoint_thread.is_alive():
+            return
+        cls._checkpoint_stop.clear()
+        cls._checkpoint_thread = threading.Thread(target=cls._run_checkpointer, daemon=True, name="session-checkpoint")
+        cls._checkpoint_thread.start()
+
+    @classmethod
+    def _run_checkpointer(cls):
+        while not cls._checkpoint_stop.wait(max(1.0, Config.get("session_checkpoint_seconds"))):
+            cls.checkpoint_all()
+
+    @classmethod
+    def recover_counters(cls):
+        """
+        Boot-time recovery of sessions interrupted while capturing.
+        A journal left on disk means the store may be behind: file_count,
+        size_bytes and last_frame_at are recounted from the session folder,
+        which is what actually survived, and the rolling-window eviction
+        count is taken from the last journaled entry.
+        """
+        from lib.class_camera import Camera
+
+        for session_id, journaled in CounterJournal.replay().items():
+            stored = SessionStore.get(session_id)
+            if stored is None:
+                CounterJournal.remove(session_id)
+                continue
+
+            frames = [
+                f for f in (cls._capture_dir / session_id).glob("*.jpg")
+                if f.name != "thumbnail.jpg"
+            ]
+            last = max((Camera.timestamp_from_name(f.name, warn=False) for f in frames), default=None)
+            counters = {
+                "file_count": len(frames),
+                "size_bytes": sum(f.stat().st_size for f in frames),
+                "last_frame_at": last.isoformat() if last else None
+            }
+            if journaled and journaled.get("rolling_window"):
+                counters["rolling_window"] = journaled["rolling_window"]
+
+            expected = journaled or stored
+            if (expected.get("file_count"), expected.get("size_bytes")) != (counters["file_count"], counters["size_bytes"]):
+                Logger.warning(
+                    f"Session {session_id}: journal had {expected.get('file_count')} frame(s), "
+                    f"folder has {counters['file_count']}; using the folder",
+                    category="session"
+                )
+            SessionStore.update(session_id, counters)
+            CounterJournal.remove(session_id)
+            Logger.info(f"Recovered counters for interrupted session {session_id}", category="session")
+
     @staticmethod
     def _calculate_uptime(session):
         started = session.get("started_at")
@@ -338,45 +580,21 @@ class Session:
     # ------------------ Internal Helpers ------------------
 
     @classmethod
-    def _get_sessions(cls):
-        if cls._sessions_cache is None:
-            cls._sessions_cache = cls._load_sessions()
-        return cls._sessions_cache
-
-    @classmethod
-    def _save_sessions(cls, sessions=None):
-        data = sessions if sessions is not None else cls._sessions_cache
-        with open(cls._session_file, "w") as f:
-            json.dump(data, f, indent=2)
-
-    @classmethod
-    def _load_sessions(cls):
-        if not os.path.exists(cls._session_file):
-            return []
-
-        with open(cls._session_file, "r") as f:
-            sessions = json.load(f)
-
-        valid_sessions = [
-            s for s in sessions if (cls._capture_dir / s["session_id"]).exists()
-        ]
-
-        if len(valid_sessions) != len(sessions):
-            cls._save_sessions(valid_sessions)
-
-        return valid_sessions
+    def _get_by_id(cls, session_id):
+        return cls._with_live_counters(SessionStore.get(session_id))
 
     @classmethod
-    def _get_by_id(cls, session_id):
-        return next((s for s in cls._get_sessions() if s.get("session_id") == session_id), None)
+    def _with_live_counters(cls, session: dict):
+        """Counters of a capturing session are newer in memory than in the store."""
+        live = cls._live.get(session["session_id"]) if session else None
+        if live is None:
+            return session
+        return {**session, **{k: live.session.get(k) for k in cls.HOT_FIELDS}}
 
     @classmethod
     def get_latest_session(cls):
-        sessions = cls._get_sessions()
-        if not sessions:
-            return None
-        latest = sorted(sessions, key=lambda s: s["started_at"], reverse=True)[0]
-        return Session(latest.get("session_id"))
+        latest = SessionStore.latest()
+        return Session(latest["session_id"]) if latest else None
 
     @classmethod
     def by_id(cls, session_id):
@@ -386,13 +604,21 @@ class Session:
         except Exception:
             return None
 
-    @staticmethod
-    def total_size(human=False):
+    @classmethod
+    def total_size(cls, human=False):
         capture_dir = Config.get("storage_path")
         zip_dir = Config.get("download_path")
 
         def get_size(path):
-            return sum(f.stat().st_size for f in path.rglob("*.jpg"))
+            # Stored size_bytes (live counters for capturing sessions), the frame
+            # manifest only for sessions without one, plus their burst sub-sequences
+            total = 0
+            for s in SessionStore.all():
+                s = cls._with_live_counters(s)
+                size = s.get("size_bytes")
+                total += FrameManifest(path / s["session_id"]).total_bytes() if size is None else size
+                total += sum(b.get("bytes", 0) for b in s.get("bursts", []))
+            return total
 
         def get_zips(path):
             return sum(f.stat().st_size for f in path.rglob("*.zip"))
@@ -0,0 +1,281 @@
+import os
+import copy
+import json
+import bisect
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+
+
+class SessionStore:
+    """
+    SQLite (WAL) storage behind the Session API.
+
+    Each session is one row: the full session dict as JSON plus indexed
+    copies of the fields used for lookups (camera, status, started_at).
+    Updates patch individual fields in place with json_set, so a frame
+    only rewrites its own row instead of the whole session list.
+
+    Reads never touch the database: the rows are loaded once into an
+    in-memory index that every write below keeps in step with the table:
+      - _by_id:   session_id -> session dict
+      - _order:   sorted (started_at, session_id), for listing and latest()
+      - _active:  camera -> sorted (started_at, session_id) of active sessions
+      - _status:  session count per status
+    Sessions go in and come out as deep copies, so callers mutating a
+    session or its lists (tags, bursts, exposure locks) cannot change the
+    index behind the store's back.
+    """
+    COLUMNS = ("camera", "status", "started_at", "ended_at")
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            camera     TEXT NOT NULL DEFAULT 'default',
+            status     TEXT,
+            started_at TEXT,
+            ended_at   TEXT,
+            data       TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions (status, camera);
+        CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions (started_at);
+    """
+
+    _conn = None
+    _root = None
+    _lock = threading.RLock()
+
+    _by_id = {}
+    _order = []
+    _active = {}
+    _status = Counter()
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Use classmethods only — do not instantiate SessionStore")
+
+    # ------------------ Connection ------------------
+
+    @classmethod
+    def _db(cls) -> sqlite3.Connection:
+        # Compared by attribute so the common case costs no filesystem call
+        if cls._conn is not None and cls._root == Config.config_dir():
+            return cls._conn
+        with cls._lock:
+            if cls._conn is not None and cls._root == Config.config_dir():
+                return cls._conn
+            cls.close()
+
+            conn = sqlite3.connect(Config.config_path("sessions.db"), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(cls._schema)
+            cls._conn = conn
+            cls._migrate_json(Path(Config.config_path("sessions.json")))
+            cls._load_index()
+            cls._root = Config.config_dir()
+            return conn
+
+    @classmethod
+    def close(cls):
+        with cls._lock:
+            cls._root = None
+            if cls._conn is not None:
+                cls._conn.close()
+                cls._conn = None
+
+    @classmethod
+    def _execute(cls, sql: str, params=()) -> sqlite3.Cursor:
+        with cls._lock:
+            return cls._db().execute(sql, params)
+
+    # ------------------ Reads ------------------
+
+    @classmethod
+    def get(cls, session_id: str) -> dict:
+        cls._db()
+        session = cls._by_id.get(session_id)
+        return copy.deepcopy(session) if session else None
+
+    @classmethod
+    def exists(cls, session_id: str) -> bool:
+        cls._db()
+        return session_id in cls._by_id
+
+    @classmethod
+    def all(cls, **filters) -> list:
+        """Sessions ordered by started_at, filtered on indexed columns (e.g. status="active")."""
+        cls._check_filters(filters)
+        cls._db()
+        with cls._lock:
+            sessions = [cls._by_id[sid] for _, sid in cls._order]
+        return [copy.deepcopy(s) for s in sessions if all(s.get(k) == v for k, v in filters.items())]
+
+    @classmethod
+    def first(cls, **filters) -> dict:
+        cls._check_filters(filters)
+        cls._db()
+        if filters.get("status") == "active" and set(filters) <= {"status", "camera"}:
+            with cls._lock:
+                if "camera" in filters:
+                    active = cls._active.get(filters["camera"])
+                    first = active[0] if active else None
+                else:
+                    first = min((a[0] for a in cls._active.values() if a), default=None)
+            return cls.get(first[1]) if first else None
+        return next(iter(cls.all(**filters)), None)
+
+    @classmethod
+    def latest(cls) -> dict:
+        cls._db()
+        with cls._lock:
+            return cls.get(cls._order[-1][1]) if cls._order else None
+
+    @classmethod
+    def count(cls, **filters) -> int:
+        cls._check_filters(filters)
+        cls._db()
+        if not filters:
+            return len(cls._by_id)
+        if set(filters) == {"status"}:
+            return cls._status[filters["status"]]
+        return len(cls.all(**filters))
+
+    @classmethod
+    def ids(cls) -> list:
+        cls._db()
+        with cls._lock:
+            return [sid for _, sid in cls._order]
+
+    # ------------------ Writes ------------------
+
+    @classmethod
+    def insert(cls, session: dict):
+        with cls._lock:
+            cls._execute(
+                "INSERT OR REPLACE INTO sessions (session_id, camera, status, started_at, ended_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                cls._row(session)
+            )
+            cls._unindex(session["session_id"])
+            cls._index(copy.deepcopy(session))
+
+    # A full rewrite of the row is the same statement
+    replace = insert
+
+    @classmethod
+    def update(cls, session_id: str, fields: dict):
+        """Patch only the given fields of a session (and their indexed columns)."""
+        if not fields:
+            return
+        paths, params = [], []
+        for key, value in fields.items():
+            paths.append("?, json(?)")
+            params += [f'$."{key}"', json.dumps(value)]
+
+        columns = [k for k in fields if k in cls.COLUMNS]
+        sets = ", ".join([f"data = json_set(data, {', '.join(paths)})"] + [f"{c} = ?" for c in columns])
+        params += [fields[c] for c in columns]
+        with cls._lock:
+            cls._execute(f"UPDATE sessions SET {sets} WHERE session_id = ?", params + [session_id])
+            session = cls._by_id.get(session_id)
+            if session is None:
+                return
+            fields = copy.deepcopy(fields)
+            if columns:
+                cls._unindex(session_id)
+                session.update(fields)
+                cls._index(session)
+            else:
+                session.update(fields)
+
+    @classmethod
+    def delete(cls, *session_ids: str):
+        with cls._lock:
+            db = cls._db()
+            db.execute("BEGIN")
+            db.executemany("DELETE FROM sessions WHERE session_id = ?", [(sid,) for sid in session_ids])
+            db.execute("COMMIT")
+            for sid in session_ids:
+                cls._unindex(sid)
+
+    # ------------------ Index ------------------
+
+    @classmethod
+    def _load_index(cls):
+        cls._by_id, cls._order, cls._active, cls._status = {}, [], {}, Counter()
+        for (data,) in cls._conn.execute("SELECT data FROM sessions"):
+            cls._index(json.loads(data))
+
+    @classmethod
+    def _index(cls, session: dict):
+        sid = session["session_id"]
+        key = (session.get("started_at") or "", sid)
+        cls._by_id[sid] = session
+        bisect.insort(cls._order, key)
+        cls._status[session.get("status")] += 1
+        if session.get("status") == "active":
+            bisect.insort(cls._active.setdefault(session.get("camera") or "default", []), key)
+
+    @classmethod
+    def _unindex(cls, session_id: str):
+        session = cls._by_id.pop(session_id, None)
+        if session is None:
+            return
+        key = (session.get("started_at") or "", session_id)
+        cls._remove_sorted(cls._order, key)
+        cls._status[session.get("status")] -= 1
+        if session.get("status") == "active":
+            active = cls._active.get(session.get("camera") or "default", [])
+            cls._remove_sorted(active, key)
+
+    @staticmethod
+    def _remove_sorted(items: list, key: tuple):
+        i = bisect.bisect_left(items, key)
+        if i < len(items) and items[i] == key:
+            del items[i]
+
+    # ------------------ Helpers ------------------
+
+    @classmethod
+    def _check_filters(cls, filters: dict):
+        unknown = set(filters) - set(cls.COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot filter sessions on {', '.join(sorted(unknown))}")
+
+    @staticmethod
+    def _row(session: dict) -> tuple:
+        return (
+            session["session_id"],
+            session.get("camera") or "default",
+            session.get("status"),
+            session.get("started_at"),
+            session.get("ended_at"),
+            json.dumps(session)
+        )
+
+    @classmethod
+    def _migrate_json(cls, json_path: Path):
+        """One-time import of the old sessions.json, which is kept as sessions.json.migrated."""
+        if not json_path.exists():
+            return
+        try:
+            with json_path.open("r") as f:
+                sessions = [s for s in json.load(f) if s.get("session_id")]
+        except Exception as e:
+            Logger.error(f"Could not migrate {json_path.name}: {e}", category="session")
+            return
+
+        db = cls._conn
+        db.execute("BEGIN")
+        db.executemany(
+            "INSERT OR IGNORE INTO sessions (session_id, camera, status, started_at, ended_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [cls._row(s) for s in sessions]
+        )
+        db.execute("COMMIT")
+        os.replace(json_path, json_path.with_name(json_path.name + ".migrated"))
+        Logger.info(f"Migrated {len(sessions)} session(s) from {json_path.name} to SQLite", category="session")
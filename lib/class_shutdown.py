@@ -6,6 +6,7 @@ from lib.class_logging import Logger
 from lib.class_temp import TempZip
 from lib.class_status import Status
 from lib.class_config import Config
+from lib.class_write_stager import WriteStager
 
 class ShutdownManager:
     _called = False
@@ -21,16 +22,29 @@ class ShutdownManager:
             TempZip.get_instance().destroy()
             Logger.info("App exiting, TempZip destroyed", category="app")
 
-            # Stop camera
+            # Stop cameras and wait for their loops to drain post-processing and staging
+            for camera in Camera.all():
+                if camera.is_running():
+                    camera.stop()
+                    Logger.info(f"Camera '{camera.name}' capture stopped", category="camera")
+            for camera in Camera.all():
+                thread = camera.capture_thread
+                if thread and thread.is_alive():
+                    thread.join(timeout=30)
+                    if thread.is_alive():
+                        Logger.warning(f"Camera '{camera.name}' capture loop did not finish", category="camera")
+
+            # Staged frames live in tmpfs and are lost on reboot
+            WriteStager.flush()
             camera = Camera.get_instance()
-            if camera.is_running():
-                camera.stop()
-                Logger.info("Camera capture stopped", category="camera")
             if camera.is_streaming():
                 camera.stop_streamer()
                 Logger.info("Streamer stopped", category="camera")
             Camera.remove_temp_images()
 
+            # Write out in-memory session counters
+            Session.stop_checkpointer()
+
             # End sessions
             active = [s for s in Session.list_all() if s.get("status") == "active"]
             for s in active:
@@ -9,6 +9,9 @@ from lib.class_session import Session
 from lib.class_config import Config
 from lib.class_socket import SocketManager
 from lib.class_logging import Logger
+from lib.class_metrics import Metrics
+from lib.class_governor import ThrottleGovernor
+from lib.class_write_stager import WriteStager
 
 
 class Status:
@@ -22,7 +25,7 @@ class Status:
     def build() -> dict:
         camera = Camera.get_instance()
         mode = camera.get_mode()
-        session = Session.get_active_session() if mode == "capture" else Session.get_latest_session()
+        session = Session.get_active_session(camera.name) if mode == "capture" else Session.get_latest_session()
         session_data = session.get_session() if session else False
 
         disk = Status.get_disk_usage()    
@@ -35,7 +38,17 @@ class Status:
         return {
             "mode": mode,
             "libcamera": libcamera,
+            "stream_tap": camera.is_tapping(),
             "latest_session": session_data,
+            "change": camera.get_change_heatmap(),
+            "schedule": camera.get_schedule_stats(),
+            "postprocess": camera.get_postprocess_stats(),
+            "burst": camera.get_burst_stats(),
+            "rolling": camera.get_rolling_stats(),
+            "cameras": {cam.name: cam.get_status() for cam in Camera.all()},
+            "throttle": ThrottleGovernor.status(),
+            "staging": WriteStager.stats() if WriteStager.is_enabled() else None,
+            "metrics": Metrics.summary() if Metrics.is_enabled() else None,
             "system": {
                 "cpu_load": cpu_load,
                 "memory_usage": memory_usage,
@@ -47,7 +60,7 @@ class Status:
 
     @staticmethod
     def is_libcamera_streaming():
-        return Camera.get_capture_mode() == "streaming" and Camera._using_libcamera()
+        return Camera.is_streaming() and Camera._using_libcamera()
 
     @staticmethod
     def get_uptime(string = False):
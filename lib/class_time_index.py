@@ -0,0 +1,251 @@
+import os
+import json
+import heapq
+import bisect
+import threading
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+from lib.class_frame_manifest import FrameManifest
+
+
+class TimeIndex:
+    """
+    Answers "which frames were captured between T1 and T2" across all
+    sessions without walking storage_path.
+
+    Two levels, both searched with bisect:
+      - per-session ranges (first frame, last frame, frame count), kept
+        sorted by first frame, with a running maximum of the last frame
+        so the sessions overlapping a window are found without a scan
+      - per-frame positions inside a session, from its frame manifest,
+        whose timestamps are already in capture order
+
+    Burst sub-folders are not indexed; range zips add their frames from
+    the bursts recorded on each session.
+
+    The ranges are persisted to data/config/time_index.json whenever a
+    session ends or is removed. The capturing session's range is only
+    extended in memory and is marked open; open ranges are refreshed
+    from their manifests when the index is loaded, so a crash never
+    leaves it behind the frames on disk.
+    """
+    _ranges = None  # session_id -> {"first", "last", "frames", "camera", "open"}
+    _order = []     # session_ids sorted by first frame
+    _firsts = []    # first frame along _order
+    _reach = []     # running max of the last frame along _order
+    _stale = True
+    _lock = threading.RLock()
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Use classmethods only — do not instantiate TimeIndex")
+
+    @classmethod
+    def load(cls):
+        """
+        Build the index at startup. Otherwise the first extend() would do it
+        on the post-process worker, rebuilding missing manifests for every
+        past session while a capture waits.
+        """
+        with cls._lock:
+            ranges = cls._load()
+        Logger.info(f"Time index loaded ({len(ranges)} sessions)", category="session")
+
+    # ------------------ Updates ------------------
+
+    @classmethod
+    def extend(cls, session_id: str, camera: str, first: str, last: str, count: int):
+        """Record newly captured frames of a session (timestamps as ISO strings)."""
+        with cls._lock:
+            ranges = cls._load()
+            r = ranges.get(session_id)
+            if r is None:
+                r = ranges[session_id] = {"first": first, "last": last, "frames": 0, "camera": camera, "open": True}
+            r["first"] = min(r["first"], first) if r["frames"] else first
+            r["last"] = max(r["last"], last)
+            r["frames"] += count
+            r["open"] = True
+            cls._stale = True
+
+    @classmethod
+    def trim(cls, session_id: str, first: str, count: int):
+        """Record frames evicted from the start of a session (rolling window)."""
+        with cls._lock:
+            r = cls._load().get(session_id)
+            if r is None:
+                return
+            r["frames"] = max(0, r["frames"] - count)
+            if first:
+                r["first"] = first
+            cls._stale = True
+
+    @classmethod
+    def close(cls, session_id: str):
+        """Session ended: its range is final, persist it."""
+        with cls._lock:
+            r = cls._load().get(session_id)
+            if r is not None:
+                r["open"] = False
+            cls._save()
+
+    @classmethod
+    def remove(cls, *session_ids: str):
+        with cls._lock:
+            ranges = cls._load()
+            for session_id in session_ids:
+                ranges.pop(session_id, None)
+            cls._stale = True
+            cls._save()
+
+    # ------------------ Queries ------------------
+
+    @classmethod
+    def sessions_between(cls, start: str, end: str) -> list:
+        """Session IDs with frames in [start, end], by first frame."""
+        with cls._lock:
+            cls._load()
+            cls._reindex()
+            # Ranges beginning after end are past hi; those whose running max ends before start are before lo
+            hi = bisect.bisect_right(cls._firsts, end)
+            lo = bisect.bisect_left(cls._reach, start, 0, hi)
+            return [
+                sid for sid in cls._order[lo:hi]
+                if cls._ranges[sid]["last"] >= start and cls._ranges[sid]["frames"]
+            ]
+
+    @classmethod
+    def frames(cls, start, end, offset: int = 0, limit: int = None) -> dict:
+        """
+        Frames captured in [start, end] (datetimes or ISO strings) across
+        all sessions, in time order, paginated by offset and limit.
+        """
+        start, end = cls._iso(start), cls._iso(end)
+        storage = Config.get("storage_path")
+
+        # Only the session list is read under the lock; manifests are read
+        # outside it so a large query never holds up extend() on the capture path
+        with cls._lock:
+            sids = cls.sessions_between(start, end)
+            cameras = {sid: cls._ranges[sid].get("camera", "default") for sid in sids}
+
+        slices = []
+        for sid in sids:
+            found = FrameManifest(storage / sid).between(start, end)
+            if found:
+                slices.append([(e[0], sid, e) for e in found])
+
+        total = sum(len(s) for s in slices)
+        merged = heapq.merge(*slices) if len(slices) > 1 else iter(slices[0] if slices else [])
+        page = list(islice(merged, offset, None if limit is None else offset + limit))
+        return {
+            "from": start,
+            "to": end,
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "next_offset": offset + len(page) if offset + len(page) < total else None,
+            "frames": [
+                {
+                    "session_id": sid,
+                    "camera": cameras[sid],
+                    "timestamp": ts,
+                    "filename": entry[1],
+                    "size": entry[2],
+                    "score": entry[3]
+                }
+                for ts, sid, entry in page
+            ]
+        }
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            ranges = cls._load()
+            return {
+                "sessions": len(ranges),
+                "frames": sum(r["frames"] for r in ranges.values()),
+                "open": sum(1 for r in ranges.values() if r["open"])
+            }
+
+    # ------------------ Internal ------------------
+
+    @staticmethod
+    def _iso(value) -> str:
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+
+    @staticmethod
+    def _path() -> Path:
+        return Path(Config.config_path("time_index.json"))
+
+    @classmethod
+    def _load(cls) -> dict:
+        if cls._ranges is not None:
+            return cls._ranges
+
+        ranges = {}
+        path = cls._path()
+        if path.exists():
+            try:
+                with path.open("r") as f:
+                    ranges = json.load(f)
+            except Exception as e:
+                Logger.warning(f"Time index unreadable, rebuilding: {e}", category="session")
+
+        from lib.class_session_store import SessionStore
+        storage = Config.get("storage_path")
+        sessions = {s["session_id"]: s for s in SessionStore.all()}
+
+        changed = False
+        for sid in list(ranges):
+            if sid not in sessions:
+                del ranges[sid]
+                changed = True
+        for sid, session in sessions.items():
+            if sid not in ranges or ranges[sid].get("open"):
+                ranges[sid] = cls._from_manifest(FrameManifest(storage / sid), session)
+                changed = True
+
+        cls._ranges = ranges
+        cls._stale = True
+        if changed:
+            cls._save()
+        return ranges
+
+    @staticmethod
+    def _from_manifest(manifest: FrameManifest, session: dict) -> dict:
+        entries = manifest.entries()
+        return {
+            "first": entries[0][0] if entries else "",
+            "last": entries[-1][0] if entries else "",
+            "frames": len(entries),
+            "camera": session.get("camera", "default"),
+            "open": session.get("status") == "active"
+        }
+
+    @classmethod
+    def _reindex(cls):
+        if not cls._stale:
+            return
+        order = sorted(cls._ranges, key=lambda sid: (cls._ranges[sid]["first"], sid))
+        reach, top = [], ""
+        for sid in order:
+            top = max(top, cls._ranges[sid]["last"])
+            reach.append(top)
+        cls._order = order
+        cls._firsts = [cls._ranges[sid]["first"] for sid in order]
+        cls._reach = reach
+        cls._stale = False
+
+    @classmethod
+    def _save(cls):
+        path = cls._path()
+        tmp = path.with_name(f".{path.name}.tmp")
+        try:
+            with open(tmp, "w") as f:
+                json.dump(cls._ranges, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            Logger.error(f"Failed to save time index: {e}", category="session")
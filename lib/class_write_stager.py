@@ -0,0 +1,280 @@
+import os
+import time
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from lib.class_config import Config
+from lib.class_logging import Logger
+
+
+class WriteStager:
+    """
+    Optional write-back staging of captured frames on RAM-backed storage.
+
+    Frames are written under staging_path (tmpfs) mirroring their final
+    location in storage_path, and a flusher thread moves them to storage
+    in batches: every staging_flush_seconds, or sooner once
+    staging_flush_frames are pending. Staged bytes are capped at
+    staging_ram_mb; over budget, frames are written straight to storage.
+
+    staging_fsync controls durability of the flush:
+      - "always": fsync every file as it is copied
+      - "batch":  fsync the whole batch once it is copied, then rename
+      - "never":  leave write-back to the kernel
+    """
+    FSYNC_POLICIES = ("always", "batch", "never")
+
+    _pending = OrderedDict()  # final path -> (staged path, size)
+    _folders = set()
+    _bytes = 0
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _wake = threading.Event()
+    _thread = None
+    _running = False
+    _users = 0
+    _stats = {"staged": 0, "direct": 0, "flushed": 0, "batches": 0, "errors": 0, "last_flush_ms": None}
+
+    def __new__(cls, *args, **kwargs):
+        raise RuntimeError("Use classmethods only — do not instantiate WriteStager")
+
+    # ------------------ Public ------------------
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return Config.get("staging_enabled")
+
+    @staticmethod
+    def root() -> Path:
+        return Config.get("staging_path")
+
+    @classmethod
+    def latest_path(cls) -> Path:
+        """latest.jpg lives next to the staged frames so publishing it never touches the SD card."""
+        return cls.root() / "latest.jpg" if cls.is_enabled() else Config.get("latest_symlink")
+
+    @classmethod
+    def start(cls):
+        """Called by each capture loop; the flusher runs while any camera is capturing."""
+        if not cls.is_enabled():
+            return
+        with cls._lock:
+            cls._users += 1
+            if cls._thread and cls._thread.is_alive():
+                return
+            cls.root().mkdir(parents=True, exist_ok=True)
+            cls._folders.clear()
+            cls._running = True
+            cls._wake.clear()
+            cls._thread = threading.Thread(target=cls._run, daemon=True, name="write-stager")
+            cls._thread.start()
+        Logger.info(f"Write staging started in {cls.root()}", category="storage")
+
+    @classmethod
+    def stop(cls, timeout: float = 30):
+        """Flush everything still staged; the last capture loop out also stops the flusher."""
+        with cls._lock:
+            if not cls._thread:
+                return
+            cls._users = max(0, cls._users - 1)
+            thread = None
+            if cls._users == 0:
+                thread, cls._thread = cls._thread, None
+                cls._running = False
+        if thread is None:
+            cls.flush()
+            return
+        cls._wake.set()
+        thread.join(timeout=timeout)
+        cls.flush()
+
+    @classmethod
+    def write(cls, final: Path, data: bytes) -> bool:
+        """Write a frame destined for final; staged in RAM when enabled and within budget."""
+        target = cls.reserve(final, len(data))
+        try:
+            with open(target, "wb") as f:
+                f.write(data)
+        except Exception as e:
+            Logger.error(f"Failed to write frame {target}: {e}", category="storage")
+            return False
+        cls.commit(final, target)
+        return True
+
+    @classmethod
+    def reserve(cls, final: Path, size: int = 0) -> Path:
+        """Return the path a frame for final should be written to."""
+        if not cls._running:
+            return final
+        try:
+            staged = cls.root() / final.relative_to(Config.get("storage_path"))
+        except ValueError:
+            return final
+        if cls._bytes + size > Config.get("staging_ram_mb") * 1024 * 1024:
+            cls._wake.set()
+            return final
+        if staged.parent not in cls._folders:
+            staged.parent.mkdir(parents=True, exist_ok=True)
+            cls._folders.add(staged.parent)
+        return staged
+
+    @classmethod
+    def commit(cls, final: Path, written: Path):
+        """Register a frame written to the path reserve() returned."""
+        if written == final:
+            with cls._lock:
+                cls._stats["direct"] += 1
+            return
+        size = written.stat().st_size
+        with cls._lock:
+            cls._pending[final] = (written, size)
+            cls._bytes += size
+            cls._stats["staged"] += 1
+            due = len(cls._pending) >= Config.get("staging_flush_frames")
+        if due:
+            cls._wake.set()
+
+    @classmethod
+    def resolve(cls, final: Path) -> Path:
+        """Where the frame for final can be read right now."""
+        with cls._lock:
+            entry = cls._pending.get(final)
+        return entry[0] if entry else final
+
+    @classmethod
+    def discard(cls, final: Path):
+        """Delete a frame whether it is still staged or already flushed."""
+        with cls._flush_lock, cls._lock:
+            entry = cls._pending.pop(final, None)
+            if entry:
+                cls._bytes -= entry[1]
+        (entry[0] if entry else final).unlink(missing_ok=True)
+
+    @classmethod
+    def flush(cls) -> int:
+        """Move everything staged so far to storage. Returns the number of frames moved."""
+        with cls._flush_lock:
+            with cls._lock:
+                batch = list(cls._pending.items())
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            moved = cls._move_batch([(final, staged) for final, (staged, _) in batch])
+
+            with cls._lock:
+                cls._stats["flushed"] += len(moved)
+                cls._stats["batches"] += 1
+                cls._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return len(moved)
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {
+                "enabled": cls.is_enabled(),
+                "fsync": Config.get("staging_fsync"),
+                "pending": len(cls._pending),
+                "pending_bytes": cls._bytes,
+                "budget_bytes": Config.get("staging_ram_mb") * 1024 * 1024,
+                **cls._stats
+            }
+
+    @classmethod
+    def recover(cls):
+        """
+        Boot-time recovery of frames left in staging by a crash or kill.
+        Frames whose session folder still exists are flushed to it; the
+        rest are reported and left in place.
+        """
+        root = cls.root()
+        if not root.exists():
+            return
+        storage = Config.get("storage_path")
+        leftovers = [p for p in root.rglob("*.jpg") if p.parent != root]
+        if not leftovers:
+            return
+
+        recoverable, orphaned = [], []
+        for staged in leftovers:
+            final = storage / staged.relative_to(root)
+            session_dir = storage / staged.relative_to(root).parts[0]
+            (recoverable if session_dir.is_dir() else orphaned).append((final, staged))
+
+        for final, _ in recoverable:
+            final.parent.mkdir(parents=True, exist_ok=True)
+        moved = cls._move_batch(recoverable)
+        Logger.warning(f"Recovered {len(moved)} staged frame(s) left from previous run", category="storage")
+        if orphaned:
+            Logger.error(
+                f"{len(orphaned)} staged frame(s) in {root} have no session folder and were left in place",
+                category="storage"
+            )
+
+    # ------------------ Internal ------------------
+
+    @classmethod
+    def _run(cls):
+        while cls._running:
+            cls._wake.wait(max(0.5, Config.get("staging_flush_seconds")))
+            cls._wake.clear()
+            try:
+                cls.flush()
+            except Exception as e:
+                Logger.error(f"Staging flush failed: {e}", category="storage")
+
+    @classmethod
+    def _move_batch(cls, batch: list) -> set:
+        """Copy staged files to their final paths according to the fsync policy."""
+        policy = Config.get("staging_fsync")
+        if policy not in cls.FSYNC_POLICIES:
+            policy = "batch"
+
+        parts = []
+        for final, staged in batch:
+            part = final.with_name(f".{final.name}.part")
+            try:
+                with open(staged, "rb") as src, open(part, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                    if policy == "always":
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                parts.append((final, staged, part))
+            except Exception as e:
+                Logger.error(f"Failed to flush {staged.name}: {e}", category="storage")
+                part.unlink(missing_ok=True)
+                with cls._lock:
+                    cls._stats["errors"] += 1
+
+        if policy == "batch":
+            for _, _, part in parts:
+                cls._fsync(part)
+
+        moved = set()
+        folders = set()
+        for final, staged, part in parts:
+            os.replace(part, final)
+            # Point readers at the final copy before the staged one goes away
+            with cls._lock:
+                entry = cls._pending.get(final)
+                if entry and entry[0] == staged:
+                    del cls._pending[final]
+                    cls._bytes -= entry[1]
+            staged.unlink(missing_ok=True)
+            folders.add(final.parent)
+            moved.add(final)
+
+        if policy != "never":
+            for folder in folders:
+                cls._fsync(folder)
+        return moved
+
+    @staticmethod
+    def _fsync(path: Path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -1,15 +1,19 @@
-import os
+import time
 import zipfile
 import threading
 from datetime import datetime
-from pathlib import Path
 from threading import Thread
 
 from lib.class_config import Config
 from lib.class_logging import Logger
 from lib.class_session import Session
+from lib.class_session_store import SessionStore
+from lib.class_camera import Camera
 from lib.class_temp import TempZip
 from lib.class_socket import SocketManager
+from lib.class_governor import ThrottleGovernor
+from lib.class_write_stager import WriteStager
+from lib.class_time_index import TimeIndex
 
 
 class ZipTask:
@@ -80,11 +84,11 @@ class ZipTask:
     @classmethod
     def _parse_range(cls, from_str, to_str):
         try:
-            from_dt = datetime.fromisoformat(from_str).replace(second=0)
+            from_dt = datetime.fromisoformat(from_str).replace(second=0, microsecond=0)
         except Exception:
             from_dt = datetime.min
         try:
-            to_dt = datetime.fromisoformat(to_str).replace(second=59)
+            to_dt = datetime.fromisoformat(to_str).replace(second=59, microsecond=999999)
         except Exception:
             to_dt = datetime.max
         return from_dt, to_dt
@@ -104,7 +108,6 @@ class ZipTask:
             zip_name = f"session_{session_id}.zip"
             zip_dir = Config.get("download_path") / ("temp" if not is_idle else "")
             zip_path = zip_dir / zip_name
-            session_dir = Config.get("storage_path") / session_id
             
             if is_idle and session.get("zip_file") and (zip_dir / session.get("zip_file")).exists():
                 return {
@@ -113,13 +116,16 @@ class ZipTask:
                     "zip_size": session.get("zip_size")
                 }
             
-            jpgs = sorted([f for f in session_dir.iterdir() if f.suffix.lower() == ".jpg"])
+            if not is_idle:
+                # Include frames still staged in RAM
+                WriteStager.flush()
+            jpgs = session.manifest().paths()
             if not jpgs:
                 raise RuntimeError(f"No JPGs found for session {session_id}")
             
             with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
                 for i, file_path in enumerate(jpgs, 1):
-                    if cls._cancel_requested:
+                    if cls._should_stop():
                         zip_path.unlink(missing_ok=True)
                         return None
                     zipf.write(file_path, arcname=file_path.name)
@@ -156,6 +162,22 @@ class ZipTask:
             cls._emit_progress(idx, total, bar="overall")
         return results
 
+    @staticmethod
+    def _burst_frames(from_dt, to_dt) -> list:
+        """Frames in range from burst sub-folders, which the time index does not cover."""
+        capture_root = Config.get("storage_path")
+        start = from_dt.isoformat()
+        matched = []
+        for session in SessionStore.all():
+            for burst in session.get("bursts", []):
+                if (burst.get("ended_at") or "") < start:
+                    continue
+                for path in sorted((capture_root / session["session_id"] / burst["folder"]).glob("*.jpg")):
+                    ts = Camera.timestamp_from_name(path.name, warn=False)
+                    if ts and from_dt <= ts <= to_dt:
+                        matched.append(path)
+        return matched
+
     @classmethod
     def _zip_by_range(cls, from_dt, to_dt):
         if not cls._lock.acquire(blocking=False):
@@ -166,17 +188,12 @@ class ZipTask:
             name = f"images_{from_dt.strftime('%Y%m%d-%H%M')}_{to_dt.strftime('%Y%m%d-%H%M')}.zip"
             output_path = Config.get("download_path") / "temp" / name
             capture_root = Config.get("storage_path")
-            matched = []
-
-            for root, _, files in os.walk(capture_root):
-                for file in files:
-                    if file.lower().endswith(".jpg"):
-                        try:
-                            ts = datetime.strptime(Path(file).stem, "%Y%m%d-%H%M%S")
-                            if from_dt <= ts <= to_dt:
-                                matched.append(Path(root) / file)
-                        except ValueError:
-                            continue
+
+            # Include frames still staged in RAM
+            WriteStager.flush()
+            found = TimeIndex.frames(from_dt, to_dt)["frames"]
+            matched = [capture_root / f["session_id"] / f["filename"] for f in found]
+            matched += cls._burst_frames(from_dt, to_dt)
 
             if not matched:
                 Logger.warning("No images found in range", category="zip")
@@ -185,7 +202,7 @@ class ZipTask:
 
             with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 for idx, path in enumerate(matched):
-                    if cls._cancel_requested:
+                    if cls._should_stop():
                         output_path.unlink(missing_ok=True)
                         return None
                     arcname = path.relative_to(capture_root)
@@ -200,6 +217,21 @@ class ZipTask:
         finally:
             cls._lock.release()
 
+    @classmethod
+    def _should_stop(cls) -> bool:
+        """Checked between files: holds the job while the governor pauses zips, then reports cancellation."""
+        paused = False
+        while ThrottleGovernor.should_pause_zips() and not cls._cancel_requested:
+            if not paused:
+                paused = True
+                Logger.info("ZIP paused by throttle governor", category="zip")
+                cls._emit("zip-paused", {"throttle": ThrottleGovernor.status()["name"]})
+            time.sleep(1)
+        if paused and not cls._cancel_requested:
+            Logger.info("ZIP resumed", category="zip")
+            cls._emit("zip-resumed", {})
+        return cls._cancel_requested
+
     @classmethod
     def _emit(cls, event, data):
         SocketManager.emit(event, data)
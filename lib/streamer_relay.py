@@ -5,19 +5,28 @@ import http.server
 import socketserver
 
 PORT = 8080
-FRAME_LOCK = threading.Lock()
+FRAME_COND = threading.Condition()
 LATEST_FRAME = None
+FRAME_SEQ = 0
 stop_event = threading.Event()
 
 def set_latest_frame(frame):
-    global LATEST_FRAME
-    with FRAME_LOCK:
+    global LATEST_FRAME, FRAME_SEQ
+    with FRAME_COND:
         LATEST_FRAME = frame
+        FRAME_SEQ += 1
+        FRAME_COND.notify_all()
 
 def get_latest_frame():
-    with FRAME_LOCK:
+    with FRAME_COND:
         return LATEST_FRAME
 
+def wait_for_frame(after_seq, timeout=1.0):
+    # Block until a frame newer than after_seq arrives, so each client gets every frame once
+    with FRAME_COND:
+        FRAME_COND.wait_for(lambda: FRAME_SEQ > after_seq or stop_event.is_set(), timeout=timeout)
+        return FRAME_SEQ, LATEST_FRAME
+
 def read_stdin_loop():
     buffer = bytearray()
     while not stop_event.is_set():
@@ -51,9 +60,11 @@ class MJPEGHandler(http.server.BaseHTTPRequestHandler):
         self.end_headers()
 
         try:
+            seq = 0
             while not stop_event.is_set():
-                frame = get_latest_frame()
-                if frame:
+                new_seq, frame = wait_for_frame(seq)
+                if frame and new_seq != seq:
+                    seq = new_seq
                     self.wfile.write(b"--frame\r\n")
                     self.wfile.write(b"Content-Type: image/jpeg\r\n")
                     self.wfile.write(f"Content-Length: {len(frame)}\r\n\r\n".encode())
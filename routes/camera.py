@@ -1,8 +1,9 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, abort
 from pathlib import Path
 
 from lib.class_camera import Camera
 from lib.class_config import Config
+from lib.class_resolution_cache import ResolutionCache
 from lib.class_logging import Logger
 
 camera = Camera.get_instance()
@@ -23,7 +24,7 @@ def stop_stream():
 
 @camera_bp.route("/capture/start", methods=["POST"])
 def start_capture():
-    if camera.is_streaming():
+    if not camera.can_start_capture():
         return jsonify({"error": "Cannot start capture while streaming"}), 400
     camera.start()
     return jsonify({"status": "started"})
@@ -35,17 +36,71 @@ def stop_capture():
     return jsonify({"status": "stopped"})
 
 
-@camera_bp.route("/latest.jpg")
-def latest_image():
-    latest_path: Path = Config.get("latest_symlink")
+def _get_camera(name: str) -> Camera:
+    try:
+        return Camera.get_instance(name)
+    except ValueError:
+        abort(404)
+
+
+def _send_latest(cam: Camera):
+    latest_path: Path = cam.get_latest_path()
     if not latest_path.exists():
         placeholder = Path("static/placeholder.jpg")
         if placeholder.exists():
             return send_file(placeholder, mimetype="image/jpeg")
         return "No image available", 404
-    return send_file(latest_path, mimetype="image/jpeg")
+    # latest.jpg is swapped in by rename, so the opened file is always complete;
+    # ETag/Last-Modified let polling clients revalidate with a 304
+    return send_file(latest_path, mimetype="image/jpeg", conditional=True, etag=True)
+
+
+@camera_bp.route("/latest.jpg")
+def latest_image():
+    return _send_latest(camera)
+
+
+# ------------------ Named cameras ------------------
+
+@camera_bp.route("/list")
+def list_cameras():
+    return jsonify([
+        {"name": cam.name, "mode": cam.get_mode(), "camera_type": cam.setting("camera_type"), "bus": cam.bus()}
+        for cam in Camera.all()
+    ])
+
+
+@camera_bp.route("/<name>/status")
+def camera_status(name):
+    return jsonify(_get_camera(name).get_status())
+
+
+@camera_bp.route("/<name>/capture/start", methods=["POST"])
+def start_camera_capture(name):
+    cam = _get_camera(name)
+    if not cam.can_start_capture():
+        return jsonify({"error": f"Cannot start capture on '{name}'"}), 400
+    cam.start()
+    return jsonify({"status": "started", "camera": name})
+
+
+@camera_bp.route("/<name>/capture/stop", methods=["POST"])
+def stop_camera_capture(name):
+    _get_camera(name).stop()
+    return jsonify({"status": "stopped", "camera": name})
+
+
+@camera_bp.route("/<name>/latest.jpg")
+def camera_latest_image(name):
+    return _send_latest(_get_camera(name))
 
 @camera_bp.route("/resolutions")
 def get_resolutions():
     ratio = request.args.get("aspect_ratio")
     return jsonify(Camera.get_supported_resolutions(aspect_ratio=ratio))
+
+
+@camera_bp.route("/resolutions/refresh", methods=["POST"])
+def refresh_resolutions():
+    ResolutionCache.refresh()
+    return jsonify(ResolutionCache.info())
@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify, send_file, abort
+from datetime import datetime
 from pathlib import Path
 
 from lib.class_session import Session
 from lib.class_zip import ZipTask
 from lib.class_config import Config
+from lib.class_time_index import TimeIndex
 
 sessions_bp = Blueprint("sessions", __name__, url_prefix="/session")
 
@@ -113,6 +115,22 @@ def get_global_size():
     return jsonify(Session.total_size(human=True))
 
 
+@sessions_bp.route("/frames", methods=["GET"])
+def list_frames():
+    """
+    Frames across all sessions between ?from= and ?to= (ISO datetimes), paginated with ?offset=&limit=.
+    Burst sub-folder frames are not listed; they are recorded in each session's "bursts".
+    """
+    try:
+        start = datetime.fromisoformat(request.args["from"]) if request.args.get("from") else datetime.min
+        end = datetime.fromisoformat(request.args["to"]) if request.args.get("to") else datetime.max
+        offset = max(0, int(request.args.get("offset", 0)))
+        limit = min(max(1, int(request.args.get("limit", 500))), 5000)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    return jsonify(TimeIndex.frames(start, end, offset, limit))
+
+
 @sessions_bp.route("/delete-multiple", methods=["POST"])
 def delete_multiple():
     ids = request.json.get("session_ids", [])
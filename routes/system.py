@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from lib.class_logging import Logger
 from lib.class_status import Status
+from lib.class_metrics import Metrics
 import subprocess
 
 system_bp = Blueprint("system", __name__, url_prefix="/system")
@@ -24,6 +25,25 @@ def get_status():
     return jsonify(Status.build())
 
 
+@system_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    # Return per-stage capture latency histograms
+    return jsonify(Metrics.snapshot())
+
+
+@system_bp.route("/metrics", methods=["POST"])
+def set_metrics():
+    # Toggle metrics collection at runtime, optionally clearing samples
+    data = request.get_json(silent=True) or {}
+    if "enabled" in data:
+        enabled = str(data["enabled"]).strip().lower() in ("true", "1", "yes")
+        Metrics.set_enabled(enabled)
+        Logger.info(f"Capture metrics {'enabled' if enabled else 'disabled'}", category="system")
+    if data.get("reset"):
+        Metrics.reset()
+    return jsonify(Metrics.snapshot())
+
+
 @system_bp.route("/reboot", methods=["POST"])
 def reboot():
     # Reboot the system using subprocess